@@ -19,30 +19,47 @@
 from __future__ import annotations
 
 import logging
+import operator as op
 import re
 from contextlib import contextmanager
 from functools import lru_cache, partial
 from itertools import chain
 from operator import itemgetter
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Literal, Sequence
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Sequence,
+    TypeVar,
+)
 
 from beets import IncludeLazyConfig, config, library, plugins
+from beets.ui import Subcommand
 
 from beetsplug import fetchart  # type: ignore[attr-defined]
 
-from .http import HTTPError, http_get_text
-from .metaguru import Metaguru
-from .search import search_bandcamp
+from . import metrics, sync
+from .daemon import DEFAULT_ADDRESS, DaemonClient, DaemonError
+from .helpers import Helpers
+from .http import PAGE_CACHE_SIZE, HTTPError, http_get_text
+from .metaguru import Metaguru, Release
+from .search import SEARCH_URL, search_bandcamp
 
 if TYPE_CHECKING:
     from beets.autotag.hooks import AlbumInfo, TrackInfo
 
 JSONDict = Dict[str, Any]
 CandidateType = Literal["album", "track"]
+T = TypeVar("T")
 
 DEFAULT_CONFIG: JSONDict = {
     "include_digital_only_tracks": True,
     "search_max": 2,
+    "search_url": SEARCH_URL,
     "art": False,
     "exclude_extra_fields": [],
     "genre": {
@@ -52,6 +69,10 @@ DEFAULT_CONFIG: JSONDict = {
         "always_include": [],
     },
     "comments_separator": "\n---\n",
+    "catalognum_cache_size": 1024,
+    "page_cache_size": PAGE_CACHE_SIZE,
+    "instrumentation": {"sink": "", "path": ""},
+    "daemon": "",
 }
 
 ALBUM_URL_IN_TRACK = re.compile(r'<a id="buyAlbumLink" href="([^"]+)')
@@ -63,6 +84,8 @@ class BandcampRequestsHandler:
 
     _log: logging.Logger
     config: IncludeLazyConfig
+    _config_sources: List[Any] | None = None
+    _resolved_config: JSONDict
 
     def _exc(self, msg_template: str, *args: Sequence[str]) -> None:
         self._log.log(logging.WARNING, msg_template, *args, exc_info=True)
@@ -73,13 +96,51 @@ class BandcampRequestsHandler:
     def _get(self, url: str) -> str:
         """Return text contents of the url response."""
         try:
-            return http_get_text(url)
+            with metrics.stage("fetch"):
+                text, cached = http_get_text.call_cached(url)
         except HTTPError as e:
             self._info("{}", e)
             return ""
 
+        metrics.record_fetch(text, cached=cached)
+        return text
+
+    @property
+    def resolved_config(self) -> JSONDict:
+        """Return the flattened plugin configuration and the global options we need.
+
+        Every configuration lookup goes through all configuration sources, therefore
+        the values are only looked up again once beets configuration changes, that
+        is, once a configuration source is added or removed.
+        """
+        root = self.config.root()
+        known = self._config_sources
+        if known is None or not (
+            len(known) == len(root.sources) and all(map(op.is_, known, root.sources))
+        ):
+            resolved = self.config.flatten()
+            resolved["va_name"] = root["va_name"].as_str()
+            resolved["preferred_media"] = root["match"]["preferred"]["media"].get()
+            self._resolved_config = resolved
+            self._config_sources = list(root.sources)
+
+        return self._resolved_config
+
     def guru(self, url: str) -> Metaguru:
-        return Metaguru.from_html(self._get(url), config=self.config.flatten())
+        return Metaguru.from_html(self._get(url), config=self.resolved_config)
+
+    def release_hash(self, url: str) -> str:
+        """Return the hash of the release metadata if its page is in the cache.
+
+        The page is cached by the lookup which returned this release, unless the lookup
+        was answered by the daemon. It is not fetched again just to be hashed: an empty
+        string is returned instead, and `bcsync` stores the hash later.
+        """
+        release_hash = ""
+        if http_get_text.contains(url):
+            with self.handle_error(url):
+                release_hash = Release.from_html(self._get(url)).content_hash
+        return release_hash
 
     @contextmanager
     def handle_error(self, url: str) -> Iterator[Any]:
@@ -141,7 +202,10 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
         super().__init__()
         self.beets_config = config
         self.config.add(DEFAULT_CONFIG.copy())
+        Helpers.parse_catalognum.resize(self.config["catalognum_cache_size"].get(int))
+        http_get_text.resize(self.config["page_cache_size"].get(int))
 
+        self.register_listener("album_imported", self.album_imported)
         if self.config["art"]:
             self.register_listener("pluginload", self.loaded)
 
@@ -149,6 +213,61 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
     def data_source(self) -> str:
         return "bandcamp"
 
+    @property
+    def metrics_sink(self) -> metrics.Sink | None:
+        """Return the configured instrumentation sink, if any."""
+        sink_config = self.resolved_config["instrumentation"]
+        key = (sink_config["sink"], sink_config["path"])
+        if getattr(self, "_metrics_sink_key", None) != key:
+            self._metrics_sink = metrics.make_sink(sink_config, self._log)
+            self._metrics_sink_key = key
+
+        return self._metrics_sink
+
+    @property
+    def daemon(self) -> DaemonClient | None:
+        """Return the client of the configured lookup daemon, if any."""
+        address = self.resolved_config["daemon"]
+        if getattr(self, "_daemon_address", None) != address:
+            self._daemon = DaemonClient(address) if address else None
+            self._daemon_address = address
+
+        return self._daemon
+
+    def _instrumented(self, call: str, query: str, results: Iterable[T]) -> Iterator[T]:
+        """Pass the candidates through, measuring the lookup if instrumentation is on."""
+        sink = self.metrics_sink
+        if not sink:
+            yield from results
+            return
+
+        # candidates are collected first, so that the lookup does not stay current
+        # while the caller handles each of them
+        with metrics.lookup(call, query, sink) as lookup:
+            candidates = list(results)
+            lookup.candidates = len(candidates)
+        yield from candidates
+
+    def commands(self) -> List[Subcommand]:
+        return [sync.command(self)]
+
+    def bandcamp_albums(
+        self, lib: library.Library, query: List[str]
+    ) -> Iterator[library.Album]:
+        """Return library albums matching the query that were found on Bandcamp."""
+        for album in lib.albums(query):
+            if _from_bandcamp(album.mb_albumid):
+                yield album
+            else:
+                self._info("Skipping album with a non-bandcamp URL: {}", format(album))
+
+    def album_imported(self, lib: library.Library, album: library.Album) -> None:
+        """Store the hash of the imported release, so `bcsync` can skip it."""
+        url = album.mb_albumid
+        if _from_bandcamp(url) and (release_hash := self.release_hash(url)):
+            album[sync.HASH_FIELD] = release_hash
+            album.store()
+
     def loaded(self) -> None:
         """Add our own artsource to the fetchart plugin."""
         for plugin in plugins.find_plugins():
@@ -203,6 +322,13 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
         self, items: List[library.Item], artist: str, album: str, *_: Any, **__: Any
     ) -> Iterable[AlbumInfo]:
         """Return a sequence of album candidates matching given artist and album."""
+        yield from self._instrumented(
+            "candidates", album, self._album_candidates(items, artist, album)
+        )
+
+    def _album_candidates(
+        self, items: List[library.Item], artist: str, album: str
+    ) -> Iterator[AlbumInfo]:
         item = items[0]
         label = ""
         if items and album == item.album and artist == item.albumartist:
@@ -224,6 +350,13 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
         self, item: library.Item, artist: str, title: str
     ) -> Iterable[TrackInfo]:
         """Return a sequence of singleton candidates matching given artist and title."""
+        yield from self._instrumented(
+            "item_candidates", title, self._item_candidates(item, artist, title)
+        )
+
+    def _item_candidates(
+        self, item: library.Item, artist: str, title: str
+    ) -> Iterator[TrackInfo]:
         label = ""
         if item and title == item.title and artist == item.artist:
             label = item.label
@@ -247,12 +380,17 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
         if not albums:
             return None
 
-        if len(albums) > 1:
-            # get the preferred media
-            preferred = self.beets_config["match"]["preferred"]["media"].get()
-            pref_to_idx = dict(zip(preferred, range(len(preferred))))
-            albums = sorted(albums, key=lambda x: pref_to_idx.get(x.media, 100))
-        return albums[0]
+        return self._pick_album(albums)
+
+    def _pick_album(self, albums: List[AlbumInfo], media: str = "") -> AlbumInfo:
+        """Return the album in the given media or else in the preferred media."""
+        for album in albums:
+            if album.media == media:
+                return album
+
+        preferred = self.resolved_config["preferred_media"]
+        pref_to_idx = dict(zip(preferred, range(len(preferred))))
+        return min(albums, key=lambda x: pref_to_idx.get(x.media, 100))
 
     def track_for_id(self, track_id: str) -> TrackInfo | None:
         """Fetch a track by its bandcamp ID."""
@@ -267,6 +405,15 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
 
         If track url is given by mistake, find and fetch the album url instead.
         """
+        if daemon := self.daemon:
+            try:
+                return daemon.albums(url)
+            except DaemonError as e:
+                self._info("Looking up {} locally: {}", url, str(e))
+
+        return self._get_album_info(url)
+
+    def _get_album_info(self, url: str) -> List[AlbumInfo] | None:
         html = self._get(url)
         if html and "/track/" in url:
             m = ALBUM_URL_IN_TRACK.search(html)
@@ -278,6 +425,15 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
 
     def get_track_info(self, url: str) -> TrackInfo | None:
         """Return a TrackInfo object for a bandcamp track page."""
+        if daemon := self.daemon:
+            try:
+                return daemon.track(url)
+            except DaemonError as e:
+                self._info("Looking up {} locally: {}", url, str(e))
+
+        return self._get_track_info(url)
+
+    def _get_track_info(self, url: str) -> TrackInfo | None:
         with self.handle_error(url):
             return self.guru(url).singleton
 
@@ -285,12 +441,45 @@ class BandcampPlugin(BandcampRequestsHandler, plugins.BeetsPlugin):
         """Return a list of track/album URLs of type search_type matching the query."""
         msg = "Searching releases of type '{}' for query '{}' using '{}'"
         self._info(msg, data["search_type"], data["query"], str(data))
-        results = search_bandcamp(**data, get=self._get)
+        results = None
+        with metrics.stage("search"):
+            if daemon := self.daemon:
+                try:
+                    results = daemon.search(data)
+                except DaemonError as e:
+                    self._info("Searching locally: {}", str(e))
+            if results is None:
+                results = self._search_bandcamp(data)
         return results[: self.config["search_max"].as_number()]
 
+    def _search_bandcamp(self, data: JSONDict) -> List[JSONDict]:
+        return search_bandcamp(
+            **data, get=self._get, search_url=self.resolved_config["search_url"]
+        )
+
+
+def positive_int(value: str) -> int:
+    from argparse import ArgumentTypeError
+
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError(f"{value} is not a positive number")
+
+    return number
+
+
+def non_negative_float(value: str) -> float:
+    from argparse import ArgumentTypeError
+
+    number = float(value)
+    if not number >= 0:
+        raise ArgumentTypeError(f"{value} is not a non-negative number")
+
+    return number
+
 
 def get_args() -> Any:
-    from argparse import Action, ArgumentParser
+    from argparse import SUPPRESS, Action, ArgumentParser
 
     if TYPE_CHECKING:
         from argparse import Namespace
@@ -331,6 +520,15 @@ By default, all types are searched.
     exclusive.add_argument(
         "query", action=UrlOrQueryAction, default="", nargs="?", help="Search query"
     )
+    exclusive.add_argument(
+        "--serve",
+        nargs="?",
+        const=DEFAULT_ADDRESS,
+        metavar="ADDRESS",
+        default=SUPPRESS,
+        help="Start the lookup daemon on 'http://HOST:PORT' or 'unix:PATH',"
+        f" {DEFAULT_ADDRESS} by default",
+    )
 
     store_const = partial(
         parser.add_argument, dest="search_type", action="store_const", default=""
@@ -355,17 +553,55 @@ By default, all types are searched.
         default=1,
         help="The results page to show, 1 by default",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=SUPPRESS,
+        help="Profile the lookup and print the slowest network and parse functions",
+    )
+    parser.add_argument(
+        "--profile-output",
+        action="store",
+        dest="profile_output",
+        metavar="PATH",
+        default=SUPPRESS,
+        help="Save the profile to PATH: speedscope JSON if PATH ends with .json,"
+        " pstats otherwise. Implies --profile",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store",
+        metavar="PATH",
+        default=SUPPRESS,
+        help="Crawl all releases of the label or artist at <release-url> and append"
+        " them to PATH as JSON lines. Releases found in PATH already are skipped",
+    )
+    parser.add_argument(
+        "--jobs",
+        action="store",
+        type=positive_int,
+        default=SUPPRESS,
+        help="Number of releases to crawl at once, 2 by default",
+    )
+    parser.add_argument(
+        "--delay",
+        action="store",
+        type=non_negative_float,
+        metavar="SECONDS",
+        default=SUPPRESS,
+        help="Minimum time between crawl requests, 1 second by default",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if "crawl" not in args and {"jobs", "delay"} & set(vars(args)):
+        parser.error("--jobs and --delay can only be used with --crawl")
 
+    return args
 
-def main() -> None:
-    import json
 
-    args = get_args()
+def run(search_vars: JSONDict, index: int | None) -> None:
+    import json
 
-    search_vars = vars(args)
-    index = search_vars.pop("index", None)
     if search_vars.get("query"):
         search_results = search_bandcamp(**search_vars)
 
@@ -384,13 +620,53 @@ def main() -> None:
     else:
         pl = BandcampPlugin()
         pl._log.setLevel(10)
-        url = args.release_url
-        result = pl.get_album_info(args.release_url) or pl.get_track_info(url)
+        url = search_vars["release_url"]
+        result = pl.get_album_info(url) or pl.get_track_info(url)
         if not result:
             raise AssertionError("Failed to find a release under the given url")
 
         print(json.dumps(result))
 
 
+def crawl(label_url: str, output: str, options: JSONDict) -> None:
+    from pathlib import Path
+
+    from .crawl import Crawler
+
+    if not label_url:
+        raise Exception("Specify the URL of the label or artist to crawl")
+
+    pl = BandcampPlugin()
+    counts = Crawler(pl, Path(output), **options).crawl(label_url)
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+def main() -> None:
+    args = get_args()
+
+    search_vars = vars(args)
+    if "serve" in search_vars:
+        from .daemon import serve
+
+        serve(search_vars["serve"])
+        return
+
+    index = search_vars.pop("index", None)
+    crawl_output = search_vars.pop("crawl", None)
+    crawl_options = {k: search_vars.pop(k) for k in ("jobs", "delay") if k in search_vars}
+    if crawl_output:
+        crawl(search_vars.get("release_url", ""), crawl_output, crawl_options)
+        return
+
+    profile = search_vars.pop("profile", False)
+    profile_output = search_vars.pop("profile_output", None)
+    if profile or profile_output:
+        from .profiling import run_profiled
+
+        run_profiled(partial(run, search_vars, index), profile_output)
+    else:
+        run(search_vars, index)
+
+
 if __name__ == "__main__":
     main()
@@ -3,13 +3,40 @@
 import re
 from dataclasses import dataclass
 from functools import cached_property
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern
 
-from .helpers import PATTERNS, Helpers
+from .cache import registered_lru_cache
+from .helpers import Helpers, bound_lines, is_parseable, remove_ft, to_lower
 
 JSONDict = Dict[str, Any]
 
 
+class WordPatterns(NamedTuple):
+    """Patterns that remove a catalogue number or an artist from the album name."""
+
+    by: Pattern[str]
+    keep: Pattern[str]
+    remove: Pattern[str]
+
+    @classmethod
+    @registered_lru_cache(maxsize=1024)
+    def make(cls, word: str) -> "WordPatterns":
+        w = re.escape(word)
+        return cls(
+            re.compile(rf"(?: *(?i:(compiled )?by|vs)|\W*(?i:split w)) {w}"),
+            re.compile(rf"\w {w} \w|(of|&) {w}|{w}(['_\d]| (deluxe|[el]p\b|&))", re.I),
+            re.compile(
+                rf"""
+    (?<! x )
+    (^|[^\])\w])+
+    (?i:{w})
+    ([^(\[\w]| _|(\d+$))*
+                """,
+                re.VERBOSE,
+            ),
+        )
+
+
 @dataclass
 class AlbumName:
     _series = r"(?i:\b(part|volume|pt|vol)\b\.?)"
@@ -31,6 +58,7 @@ class AlbumName:
         re.IGNORECASE + re.VERBOSE,
     )
     COMPILATION_IN_TITLE = re.compile(r"compilation|best of|anniversary", re.I)
+    IN_BRACKETS = re.compile(r"^\[(.*)\]$")
 
     original: str
     description: str
@@ -59,6 +87,9 @@ class AlbumName:
         1. If 'EP' or 'LP' is in the original name, album name is what precedes it.
         2. If quotes are used in the title, they probably contain the album name.
         """
+        if not is_parseable(self.original):
+            return None
+
         if m := self.EPLP_ALBUM.search(self.original):
             return " ".join(i.strip(" '") for i in m.groups())
 
@@ -127,11 +158,9 @@ class AlbumName:
         return self.SERIES_FMT.sub(self.format_series, album)
 
     @staticmethod
-    def remove_label(name: str, label: str) -> str:
-        if not label:
-            return name
-
-        pattern = re.compile(
+    @registered_lru_cache(maxsize=256)
+    def label_pattern(label: str) -> Pattern[str]:
+        return re.compile(
             rf"""
             \W*               # pick up any punctuation
             (?<!\w[ ])        # cannot be preceded by a simple word
@@ -141,7 +170,13 @@ class AlbumName:
         """,
             flags=re.VERBOSE | re.IGNORECASE,
         )
-        return pattern.sub(" ", name).strip()
+
+    @classmethod
+    def remove_label(cls, name: str, label: str) -> str:
+        if not label:
+            return name
+
+        return cls.label_pattern(label).sub(" ", name).strip()
 
     @classmethod
     def remove_va(cls, name: str) -> str:
@@ -155,27 +190,27 @@ class AlbumName:
         """Return clean album name.
 
         Catalogue number and artists to be removed are provided as 'to_clean'.
+        Words that are not found in the name are skipped, and the patterns of the
+        rest are compiled once per word and reused across releases.
+        A name that is too long to be parsed is returned as it is.
         """
-        name = re.sub(r"^\[(.*)\]$", r"\1", name)
-
-        for w in map(re.escape, filter(None, to_clean)):
-            name = re.sub(rf" *(?i:(compiled )?by|vs|\W*split w) {w}", "", name)
-            if not re.search(
-                rf"\w {w} \w|(of|&) {w}|{w}(['_\d]| (deluxe|[el]p\b|&))", name, re.I
-            ):
-                name = re.sub(
-                    rf"""
-    (?<! x )
-    (^|[^\])\w])+
-    (?i:{w})
-    ([^(\[\w]| _|(\d+$))*
-                    """,
-                    " ",
-                    name,
-                    flags=re.VERBOSE,
-                ).strip()
+        if not is_parseable(name):
+            return name
+
+        name = cls.IN_BRACKETS.sub(r"\1", name)
+
+        lowered = to_lower(name)
+        for word in filter(None, to_clean):
+            if to_lower(word) not in lowered:
+                continue
 
-        name = PATTERNS["ft"].sub("", name)
+            pats = WordPatterns.make(word)
+            name = pats.by.sub("", name)
+            if not pats.keep.search(name):
+                name = pats.remove.sub(" ", name).strip()
+            lowered = to_lower(name)
+
+        name = remove_ft(name)
         name = cls.remove_va(name)
         name = cls.remove_label(Helpers.clean_name(name), label)
         name = cls.REMIX_IN_TITLE.sub(" ", name).strip("- ")
@@ -190,12 +225,15 @@ class AlbumName:
         When album is given, search for the album.
         Otherwise, search for (Capital-case Album Name) (EP or LP) and return the match.
         """
+        if not is_parseable(album):
+            return album
+
         if album:
             look_for = re.escape(f"{album} ")
         else:
             look_for = r"((?!The|This)\b[A-Z][^ \n]+\b )+"
 
-        m = re.search(rf"{look_for}[EL]P\b", self.description)
+        m = re.search(rf"{look_for}[EL]P\b", bound_lines(self.description))
         return m.group() if m else album
 
     def get(
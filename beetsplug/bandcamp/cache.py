@@ -0,0 +1,140 @@
+"""Module with bounded caches of function results and a registry of them.
+
+Every cache is registered by the qualified name of its function, therefore their
+statistics can be reported and they can be cleared together.
+"""
+
+import hashlib
+import inspect
+from collections import OrderedDict
+from functools import _lru_cache_wrapper, lru_cache, update_wrapper
+from threading import Lock
+from typing import Any, Callable, Dict, Generic, NamedTuple, Protocol, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class Cache(Protocol):
+    """A cache which reports its statistics like `functools.lru_cache`."""
+
+    def cache_info(self) -> Any:
+        ...
+
+    def cache_clear(self) -> None:
+        ...
+
+
+# caches by the qualified names of their functions
+registry: Dict[str, Cache] = {}
+
+
+class DigestCache(Generic[T]):
+    """Least recently used cache keyed by a digest of the function arguments.
+
+    Unlike `functools.lru_cache`, it does not hold references to the arguments,
+    therefore long texts such as release descriptions do not stay in memory once
+    they have been parsed.
+    """
+
+    def __init__(self, func: Callable[..., T], maxsize: int) -> None:
+        update_wrapper(self, func)
+        self.func = func
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._signature = inspect.signature(func)
+        self._cache: "OrderedDict[bytes, T]" = OrderedDict()
+        self._lock = Lock()
+        registry[func.__qualname__] = self
+
+    def digest(self, *args: Any, **kwargs: Any) -> bytes:
+        """Return the digest of the arguments, regardless of how they were passed."""
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        digest = hashlib.blake2b(digest_size=16)
+        for value in bound.arguments.values():
+            data = str(value).encode(errors="surrogatepass")
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+        return digest.digest()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> T:
+        return self.call_cached(*args, **kwargs)[0]
+
+    def call_cached(self, *args: Any, **kwargs: Any) -> Tuple[T, bool]:
+        """Return the result and whether it was found in the cache."""
+        key = self.digest(*args, **kwargs)
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key], True
+            self.misses += 1
+
+        value = self.func(*args, **kwargs)
+        with self._lock:
+            self._cache[key] = value
+            self._trim()
+        return value, False
+
+    def contains(self, *args: Any, **kwargs: Any) -> bool:
+        """Return whether the result for the arguments is cached."""
+        key = self.digest(*args, **kwargs)
+        with self._lock:
+            return key in self._cache
+
+    def _trim(self) -> None:
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self._trim()
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+
+def digest_cache(maxsize: int) -> Callable[[Callable[..., T]], DigestCache[T]]:
+    """Cache the function results in a `DigestCache` of the given size."""
+
+    def decorator(func: Callable[..., T]) -> DigestCache[T]:
+        return DigestCache(func, maxsize)
+
+    return decorator
+
+
+def registered_lru_cache(
+    maxsize: int,
+) -> Callable[[Callable[..., T]], "_lru_cache_wrapper[T]"]:
+    """Cache the function results in `functools.lru_cache` and register the cache."""
+
+    def decorator(func: Callable[..., T]) -> "_lru_cache_wrapper[T]":
+        cached = lru_cache(maxsize=maxsize)(func)
+        registry[func.__qualname__] = cached
+        return cached
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, CacheInfo]:
+    """Return hit and miss statistics of every registered cache."""
+    return {name: CacheInfo(*cache.cache_info()) for name, cache in registry.items()}
+
+
+def clear_caches() -> None:
+    """Clear every registered cache."""
+    for cache in registry.values():
+        cache.cache_clear()
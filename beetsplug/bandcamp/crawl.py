@@ -0,0 +1,224 @@
+"""Module for crawling the discography of a label or an artist.
+
+The releases linked from the label's `/music` page are fetched and parsed by a small
+pool of workers and each result is written to a JSON lines file as soon as it is ready:
+
+    {"url": "https://label.bandcamp.com/album/release", "albums": [...]}
+    {"url": "https://label.bandcamp.com/track/single", "track": {...}}
+    {"url": "https://label.bandcamp.com/album/gone", "error": "..."}
+
+Releases that are found in the file already are skipped, therefore an interrupted crawl
+continues where it stopped once it is started again. Releases that failed are retried.
+
+Requests are spaced out by `delay` seconds regardless of the number of workers, and
+when Bandcamp asks to slow down with '429 Too Many Requests', all workers wait for the
+time it asks for.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from http import HTTPStatus
+from pathlib import Path
+from threading import Lock
+from time import monotonic, sleep
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    TypeVar,
+)
+from urllib.parse import urljoin, urlsplit
+
+from .http import HTTPError, http_get_text_uncached
+from .metaguru import Metaguru
+
+if TYPE_CHECKING:
+    from . import BandcampPlugin
+
+JSONDict = Dict[str, Any]
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_JOBS = 2
+DEFAULT_DELAY = 1.0
+MAX_RETRIES = 3
+RETRY_STATUSES = {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+# releases are linked from the grid, and, on larger pages, listed in its data
+RELEASE_URL_IN_MUSIC = re.compile(
+    r'(?:href="|"page_url": ?")((?:https?://[^/"]+)?/(?:album|track)/[^"?#]+)'
+)
+
+
+def music_url(label_url: str) -> str:
+    """Return the URL of the page which lists releases of the label or the artist."""
+    url = urlsplit(label_url)
+    return f"{url.scheme}://{url.netloc}/music"
+
+
+def release_urls(url: str, html: str) -> List[str]:
+    """Return unique release URLs found in the page, in their order."""
+    urls = (urljoin(url, path) for path in RELEASE_URL_IN_MUSIC.findall(html))
+    return list(dict.fromkeys(urls))
+
+
+def completed_urls(path: Path) -> Set[str]:
+    """Return the URLs of the releases that have been crawled successfully."""
+    if not path.exists():
+        return set()
+
+    urls = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # the last line of an interrupted crawl may be incomplete
+                continue
+            if "error" not in record:
+                urls.add(record["url"])
+    return urls
+
+
+def bounded_as_completed(
+    executor: Executor, func: Callable[[T], R], items: Iterable[T], window: int
+) -> Iterator[R]:
+    """Yield `func` results as they complete, keeping at most `window` in flight."""
+    pending: Set[Future[R]] = set()
+    for item in items:
+        pending.add(executor.submit(func, item))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (f.result() for f in done)
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        yield from (f.result() for f in done)
+
+
+def retry_after(exc: HTTPError) -> float | None:
+    """Return seconds to wait before retrying the request, if it can be retried."""
+    response = getattr(exc, "response", None)
+    if response is None or response.status_code not in RETRY_STATUSES:
+        return None
+
+    retry_after = response.headers.get("Retry-After", "")
+    return float(retry_after) if retry_after.isdigit() else 0
+
+
+def end_last_line(path: Path) -> None:
+    """Make sure that a record appended to the file starts on a new line."""
+    if path.exists() and path.stat().st_size:
+        with path.open("rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read() != b"\n":
+                f.write(b"\n")
+
+
+class Throttle:
+    """Start requests at least `delay` seconds apart across all threads."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.next_at = 0.0
+        self.lock = Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = monotonic()
+            start_at = max(now, self.next_at)
+            self.next_at = start_at + self.delay
+
+        if start_at > now:
+            sleep(start_at - now)
+
+    def back_off(self, seconds: float) -> None:
+        """Do not start any request for the given number of seconds."""
+        with self.lock:
+            self.next_at = max(self.next_at, monotonic() + seconds)
+
+
+class Crawler:
+    """Crawl releases of a label and write them to a JSON lines file."""
+
+    def __init__(
+        self,
+        plugin: BandcampPlugin,
+        output: Path,
+        jobs: int = DEFAULT_JOBS,
+        delay: float = DEFAULT_DELAY,
+    ) -> None:
+        self.plugin = plugin
+        # resolved once, before the workers start reading it
+        self.config = plugin.resolved_config
+        self.output = output
+        self.jobs = jobs
+        self.throttle = Throttle(delay)
+        self.counts: Counter[str] = Counter()
+
+    def fetch(self, url: str) -> str:
+        """Return the page, waiting and retrying if Bandcamp asks to slow down.
+
+        Crawled pages are not looked up again, therefore they are not cached.
+        """
+        attempt = 0
+        while True:
+            self.throttle.wait()
+            try:
+                return http_get_text_uncached(url)
+            except HTTPError as e:
+                wait_for = retry_after(e)
+                if wait_for is None or attempt == MAX_RETRIES:
+                    raise
+                self.throttle.back_off(max(wait_for, self.throttle.delay * 2**attempt))
+                attempt += 1
+
+    def crawl_release(self, url: str) -> JSONDict:
+        """Fetch and parse the release. This runs in a worker thread."""
+        try:
+            guru = Metaguru.from_html(self.fetch(url), self.config)
+            if "/track/" in url:
+                return {"url": url, "track": guru.singleton}
+            return {"url": url, "albums": guru.albums}
+        except Exception as e:  # pylint: disable=broad-except
+            # one broken release must not abort the crawl, it is recorded instead
+            return {"url": url, "error": str(e) or type(e).__name__}
+
+    def crawl(self, label_url: str) -> Counter[str]:
+        """Crawl releases of the label which are not found in the output yet.
+
+        Return the number of crawled, failed and skipped releases.
+        """
+        url = music_url(label_url)
+        urls = release_urls(url, self.fetch(url))
+        done = completed_urls(self.output)
+        self.counts["skipped"] = len(done.intersection(urls))
+        urls = [u for u in urls if u not in done]
+        self.plugin._info("Crawling {} releases from {}", str(len(urls)), url)
+
+        end_last_line(self.output)
+        output = self.output.open("a", encoding="utf-8")
+        with output, ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for record in bounded_as_completed(
+                executor, self.crawl_release, urls, window=self.jobs * 2
+            ):
+                self.counts["failed" if "error" in record else "crawled"] += 1
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+
+        return self.counts
@@ -0,0 +1,226 @@
+"""Module with a long-running lookup daemon and its client.
+
+Every `beet` and `beetcamp` invocation imports the plugin, compiles its patterns and
+starts with empty caches. The daemon keeps a single plugin instance warm instead,
+and answers lookups over HTTP, either on a local port or on a Unix socket:
+
+* `GET /album?url=<release url>` returns the list of albums, one for each media
+* `GET /track?url=<track url>` returns the track
+* `GET /search?query=...&search_type=a&artist=...&label=...&page=1` returns search
+  results
+
+The daemon only fetches release pages from Bandcamp and from the host of the
+configured `search_url`: it answers other URLs with '400 Bad Request', and the plugin
+then looks them up itself.
+
+Once `daemon` is configured, the plugin sends these lookups to the daemon and falls
+back to looking them up itself when the daemon cannot be reached.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socketserver
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+from beets.autotag.hooks import AlbumInfo, TrackInfo
+
+if TYPE_CHECKING:
+    from . import BandcampPlugin
+
+JSONDict = Dict[str, Any]
+DEFAULT_ADDRESS = "http://127.0.0.1:8338"
+UNIX_PREFIX = "unix:"
+ENDPOINTS = ("/album", "/track", "/search")
+SEARCH_PARAMS = {"query", "artist", "label", "search_type", "page"}
+BANDCAMP_HOST = "bandcamp.com"
+
+
+class DaemonError(Exception):
+    """The daemon could not be reached or failed to answer."""
+
+
+class BadRequest(Exception):
+    """The lookup cannot be answered, for example, the URL is not a Bandcamp one."""
+
+
+def parse_address(address: str) -> Tuple[str, Union[str, Tuple[str, int]]]:
+    """Return the base URL of the daemon and the address it listens on.
+
+    The address is either an HTTP URL, 'http://127.0.0.1:8338', or a Unix socket
+    path prefixed by 'unix:', for example, 'unix:/tmp/beetcamp.sock'.
+    """
+    if address.startswith(UNIX_PREFIX):
+        return "http://beetcamp", address[len(UNIX_PREFIX) :]
+
+    url = urlsplit(address)
+    if url.scheme != "http" or not url.hostname or url.port is None:
+        raise ValueError(
+            f"Invalid daemon address {address!r}, use 'http://HOST:PORT' or 'unix:PATH'"
+        )
+    return f"http://{url.hostname}:{url.port}", (url.hostname, url.port)
+
+
+def to_album(data: JSONDict) -> AlbumInfo:
+    tracks = [TrackInfo(**track) for track in data.pop("tracks")]
+    return AlbumInfo(tracks, **data)
+
+
+class DaemonClient:
+    """Send lookups to the daemon listening on the given address."""
+
+    def __init__(self, address: str, timeout: float = 60) -> None:
+        base_url, listen = parse_address(address)
+        transport = None
+        if isinstance(listen, str):
+            transport = httpx.HTTPTransport(uds=listen)
+        self.address = address
+        self.client = httpx.Client(
+            base_url=base_url, transport=transport, timeout=timeout
+        )
+
+    def get(self, endpoint: str, **params: Any) -> Any:
+        try:
+            response = self.client.get(endpoint, params=params)
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise DaemonError(f"{self.address}{endpoint}: {exc}") from exc
+
+        return response.json()
+
+    def albums(self, url: str) -> List[AlbumInfo] | None:
+        albums = self.get("/album", url=url)
+        return None if albums is None else list(map(to_album, albums))
+
+    def track(self, url: str) -> TrackInfo | None:
+        track = self.get("/track", url=url)
+        return None if track is None else TrackInfo(**track)
+
+    def search(self, data: JSONDict) -> List[JSONDict]:
+        return self.get("/search", **data)  # type: ignore[no-any-return]
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    plugin: BandcampPlugin
+
+    def respond(self, status: HTTPStatus, data: Any) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def search_params(params: Dict[str, str]) -> JSONDict:
+        """Return the search parameters, with the page number converted to int."""
+        unknown = params.keys() - SEARCH_PARAMS
+        if unknown:
+            raise BadRequest(f"Unknown search parameters: {', '.join(sorted(unknown))}")
+
+        data: JSONDict = dict(params)
+        if "page" in data:
+            try:
+                data["page"] = int(data["page"])
+            except ValueError:
+                raise BadRequest(f"Invalid page number: {data['page']}") from None
+
+        return data
+
+    def can_fetch(self, url: str) -> bool:
+        """Return whether the daemon may fetch the release page at the given URL.
+
+        Labels may serve their Bandcamp pages from their own domains, however, the
+        daemon only fetches pages from Bandcamp and from the host of `search_url`.
+        """
+        from . import _from_bandcamp
+
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        search_host = urlsplit(self.plugin.resolved_config["search_url"]).netloc
+        return (
+            parts.scheme in {"http", "https"}
+            and _from_bandcamp(url)
+            and (
+                host == BANDCAMP_HOST
+                or host.endswith(f".{BANDCAMP_HOST}")
+                or parts.netloc == search_host
+            )
+        )
+
+    def lookup(self, endpoint: str, params: Dict[str, str]) -> Any:
+        if endpoint == "/search":
+            return self.plugin._search_bandcamp(self.search_params(params))
+
+        url = params["url"]
+        if not self.can_fetch(url):
+            raise BadRequest(f"Not a Bandcamp release URL: {url}")
+        if endpoint == "/album":
+            return self.plugin._get_album_info(url)
+
+        return self.plugin._get_track_info(url)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path not in ENDPOINTS:
+            self.respond(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {url.path}"})
+            return
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            result = self.lookup(url.path, params)
+        except KeyError as exc:
+            self.respond(HTTPStatus.BAD_REQUEST, {"error": f"Missing parameter {exc}"})
+        except BadRequest as exc:
+            self.respond(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except Exception as exc:  # pylint: disable=broad-except
+            self.plugin._exc("Daemon failed to answer {}", self.path)
+            self.respond(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+        else:
+            self.respond(HTTPStatus.OK, result)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        self.plugin._log.log(logging.DEBUG, "{}", format % args)
+
+
+class UnixDaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        # remove the socket left behind by a previous daemon
+        if os.path.exists(self.server_address):  # type: ignore[arg-type]
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+        super().server_bind()
+
+
+def make_server(
+    address: str, plugin: BandcampPlugin
+) -> Union[ThreadingHTTPServer, UnixDaemonServer]:
+    """Return the daemon server, which answers lookups using the given plugin."""
+    _, listen = parse_address(address)
+    handler = type("Handler", (DaemonHandler,), {"plugin": plugin})
+    if isinstance(listen, str):
+        return UnixDaemonServer(listen, handler)
+    return ThreadingHTTPServer(listen, handler)
+
+
+def serve(address: str) -> None:
+    """Answer lookups on the given address until interrupted."""
+    from . import BandcampPlugin
+
+    server = make_server(address, BandcampPlugin())
+    print(f"Serving lookups on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if address.startswith(UNIX_PREFIX):
+            os.unlink(server.server_address)  # type: ignore[arg-type]
@@ -0,0 +1,119 @@
+"""Module with genre parsing functionality."""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Pattern, Tuple
+
+from .cache import registered_lru_cache
+from .genres_lookup import GENRES
+
+JSONDict = Dict[str, Any]
+
+# expand badly delimited keywords
+KEYWORD_DELIMITER = re.compile(r"[.] | #| - ")
+WORD_DELIMITER = re.compile("[ -]")
+# full stops and hashes are removed from keywords
+REMOVE_CHARS = str.maketrans("", "", ".#")
+
+
+@dataclass(frozen=True)
+class Genre:
+    """Genre matcher for a single genre configuration.
+
+    Use `Genre.from_config` to obtain it: the matcher is built once per
+    `mode` and `always_include` combination and reused for every release.
+    """
+
+    mode: str
+    always_include: Tuple[str, ...]
+
+    @classmethod
+    def from_config(cls, config: JSONDict) -> "Genre":
+        return cls.make(config["mode"], tuple(config["always_include"]))
+
+    @classmethod
+    @registered_lru_cache(maxsize=32)
+    def make(cls, mode: str, always_include: Tuple[str, ...]) -> "Genre":
+        return cls(mode, always_include)
+
+    @cached_property
+    def include_patterns(self) -> List[Pattern[str]]:
+        return [re.compile(p) for p in self.always_include]
+
+    @staticmethod
+    @registered_lru_cache(maxsize=4096)
+    def is_genre(kw: str, mode: str, always_include: Tuple[str, ...]) -> bool:
+        """Return whether the normalized keyword is a valid genre under the config.
+
+        Labels tend to use the same handful of keywords for every release, therefore
+        the decision is cached across releases.
+        """
+        genre = Genre.make(mode, always_include)
+        return genre.is_included(kw) or genre.valid_for_mode(kw)
+
+    @classmethod
+    def cache_hit_rate(cls) -> float:
+        """Return the share of keyword decisions that were served from the cache."""
+        info = cls.is_genre.cache_info()
+        total = info.hits + info.misses
+        return info.hits / total if total else 0.0
+
+    def is_included(self, kw: str) -> bool:
+        return any(p.search(kw) for p in self.include_patterns)
+
+    def valid_for_mode(self, kw: str) -> bool:
+        if kw in GENRES:
+            return True
+
+        if self.mode == "classical":
+            return False
+
+        words = [w.strip() for w in WORD_DELIMITER.split(kw)]
+        if self.mode == "progressive":
+            return all(w in GENRES for w in words)
+
+        return words[-1] in GENRES
+
+    @staticmethod
+    def normalize(keywords: Iterable[str]) -> Iterator[str]:
+        """Split badly delimited keywords and ensure the expected form of 'and'."""
+        for kw in chain.from_iterable(map(KEYWORD_DELIMITER.split, keywords)):
+            yield kw.translate(REMOVE_CHARS).replace("&", "and")
+
+    @staticmethod
+    def drop_contained(genres: List[str]) -> Iterator[str]:
+        """Drop genres that are part of another genre.
+
+        Every other genre is also compared with its spaces and dashes removed,
+        so that 'dark folk' is kept while 'darkfolk' is removed, and not the other
+        way around.
+
+        All genre forms are joined into a single string, therefore a genre is
+        contained within another one when it is found more times in the joined
+        string than in its own forms.
+        """
+        forms = []
+        for genre in genres:
+            despaced = genre.replace(" ", "").replace("-", "")
+            forms.append(genre if despaced == genre else f"{genre}\0{despaced}")
+
+        all_forms = "\0".join(forms)
+        for genre, own_forms in zip(genres, forms):
+            if all_forms.count(genre) == own_forms.count(genre):
+                yield genre
+
+    def get(self, keywords: Iterable[str], label: str) -> Iterator[str]:
+        label_name = label.lower().replace(" ", "")
+
+        def is_label_name(kw: str) -> bool:
+            return kw.replace(" ", "") == label_name and kw not in GENRES
+
+        unique_genres = dict.fromkeys(
+            kw
+            for kw in self.normalize(keywords)
+            if not is_label_name(kw)
+            and self.is_genre(kw, self.mode, self.always_include)
+        )
+        return self.drop_contained(list(unique_genres))
@@ -1,17 +1,23 @@
 """Module with a Helpers class that contains various static, independent functions."""
 
 import re
-from functools import lru_cache, partial
-from itertools import chain, starmap
-from operator import contains
-from typing import Any, Dict, Iterable, List, NamedTuple, Pattern
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Pattern, Tuple
 
 from beets.autotag.hooks import AlbumInfo
 from ordered_set import OrderedSet as ordset
 
-from .genres_lookup import GENRES
+from .cache import digest_cache, registered_lru_cache
+from .genre import Genre
 
 JSONDict = Dict[str, Any]
+# Release text comes from labels and its length is unbounded, while some of the
+# patterns below take quadratic time in the length of their input. Therefore, names
+# longer than MAX_NAME_LENGTH are kept as they are instead of being parsed, and text
+# is searched one line at a time, up to MAX_LINE_LENGTH characters of each line.
+MAX_NAME_LENGTH = 300
+MAX_LINE_LENGTH = 1000
 DIGI_MEDIA = "Digital Media"
 FORMAT_TO_MEDIA = {
     "VinylFormat": "Vinyl",
@@ -39,7 +45,7 @@ _cat_pat = CATALOGNUM_CONSTRAINT.format(
 (
       [A-Z][A-Z .]+\d{3}         # HANDS D300, CC ATOM 101
     | [A-Z-]{3,}\d+              # RIV4
-    | [A-Z]{2,}[A-Z.$-]*\d{2,}   # HS11, USE202, HEY-101, LI$INGLE025
+    | [A-Z]{2}[A-Z.$-]*\d{2,}    # HS11, USE202, HEY-101, LI$INGLE025
     | (?<!\w\W)[A-Z.]{2,}[ ]\d+  # OBS.CUR 9
     | [A-z]+-[A-z]+[ ]?\d+       # o-ton 119
     | [A-z]+[ ]?(?:[EL]P)\d+     # Dystopian LP01
@@ -66,6 +72,71 @@ CATNUM_PAT = {
     "anywhere": re.compile(rf"({_cat_pat}(\ [/-]\ {_cat_pat})?)", re.VERBOSE),
 }
 
+# every catalogue number contains a digit
+DIGIT_LINE = re.compile(r"^.*\d.*$", re.M)
+# kinds whose matches never span multiple lines and which only anchor to line
+# boundaries, therefore the text can be scanned one line at a time
+LINE_KINDS = {"start_end", "anywhere"}
+
+
+# vinyl sides of each medium
+MEDIUM_SIDES = {1: "AB", 2: "CD", 3: "EF", 4: "GH", 5: "IJ"}
+
+
+class CatnumMatch(NamedTuple):
+    kind: str
+    catalognum: str
+    match: str
+    start: int
+
+
+def scan_catalognums(text: str, kinds: Tuple[str, ...]) -> List[CatnumMatch]:
+    """Return catalogue number candidates of the given kinds found in the text.
+
+    The text is read once: lines without digits are skipped and every other line
+    is searched for all requested line-bound kinds. Candidates are ordered by
+    their position and, like with `re.finditer`, those of the same kind never
+    overlap.
+    """
+    found = [
+        CatnumMatch(kind, m.group(1), m.group(), m.start())
+        for kind in kinds
+        if kind not in LINE_KINDS
+        for m in CATNUM_PAT[kind].finditer(text)
+    ]
+    line_kinds = [k for k in kinds if k in LINE_KINDS]
+    if line_kinds:
+        for line in DIGIT_LINE.finditer(text):
+            start, end = line.span()
+            for kind in line_kinds:
+                for m in CATNUM_PAT[kind].finditer(text, start, end):
+                    found.append(CatnumMatch(kind, m.group(1), m.group(), m.start()))
+
+    return sorted(found, key=lambda m: (m.start, kinds.index(m.kind)))
+
+
+def is_parseable(name: str) -> bool:
+    """Return whether the name is short enough to be parsed."""
+    return len(name) <= MAX_NAME_LENGTH
+
+
+def bound_lines(text: str) -> str:
+    """Return the text with each of its lines cut to `MAX_LINE_LENGTH` characters."""
+    if len(text) <= MAX_LINE_LENGTH:
+        return text
+
+    return "\n".join(line[:MAX_LINE_LENGTH] for line in text.split("\n"))
+
+
+def find_catalognums(text: str, kind: str) -> Iterator[str]:
+    return (m.catalognum for m in scan_catalognums(text, (kind,)))
+
+
+@registered_lru_cache(maxsize=256)
+def label_catnum(label: str) -> Pattern[str]:
+    return re.compile(LABEL_CATNUM.format(re.escape(label)), re.VERBOSE)
+
+
 PATTERNS: Dict[str, Pattern[str]] = {
     "split_artists": re.compile(r", - |, | (?:[x+/-]|//|vs|and)[.]? "),
     "meta": re.compile(r'.*"@id".*'),
@@ -105,6 +176,66 @@ rm_strings = [
     r"CD ?\d+",
 ]
 
+# characters that case-insensitive patterns match as 'i' and 's', though their
+# lowercase form is different
+CASE_EQUIVALENTS = str.maketrans({"ı": "i", "İ": "i", "ſ": "s"})
+
+
+def to_lower(text: str) -> str:
+    """Return lowercase text that can be searched for case-insensitive triggers."""
+    if text.isascii():
+        return text.lower()
+
+    return text.translate(CASE_EQUIVALENTS).casefold()
+
+
+# PATTERNS["ft"] cannot match unless the text contains one of these
+FT_WORDS = ("ft", "feat", "with", "w/")
+
+
+def has_ft(text: str) -> bool:
+    """Return whether the text may mention a featuring artist."""
+    lowered = to_lower(text)
+    return any(w in lowered for w in FT_WORDS)
+
+
+@registered_lru_cache(maxsize=1024)
+def remove_ft(text: str) -> str:
+    """Remove the featuring artist part from the text."""
+    if has_ft(text) and is_parseable(text):
+        return PATTERNS["ft"].sub("", text)
+
+    return text
+
+
+@registered_lru_cache(maxsize=2048)
+def split_artist(artist: str) -> Tuple[str, ...]:
+    """Split a single artist string by the artist delimiters."""
+    return tuple(map(str.strip, PATTERNS["split_artists"].split(remove_ft(artist))))
+
+
+@registered_lru_cache(maxsize=1024)
+def split_unique_artists(artists: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Return unique split artists, see `Helpers.split_artists`.
+
+    Track artists are split one by one and then all together for every release,
+    therefore both single artists and artist lists are cached.
+    """
+    split = chain.from_iterable(map(split_artist, artists))
+    split_artists = ordset(split) - {"", "more"}
+
+    for artist in list(split_artists):
+        # ' & ' or ' X ' may be part of single artist name, so we need to be careful
+        # here. We check whether any of the split artists appears on their own and
+        # only split then
+        for char in "X&":
+            subartists = artist.split(f" {char} ")
+            if len(subartists) > 1 and any(s in split_artists for s in subartists):
+                split_artists.discard(artist)  # type: ignore[attr-defined]
+                split_artists.update(subartists)  # type: ignore[attr-defined]
+    return tuple(split_artists)
+
+
 REMIX = re.compile(
     r"(?P<remix>((?P<remixer>[^])]+) )?\b((re)?mix|edit|bootleg)\b[^])]*)", re.I
 )
@@ -123,20 +254,24 @@ def split_artist_title(m: re.Match) -> str:
     return f"{artist} - {title}"
 
 
+REMIX_WORDS = ("mix", "edit", "bootleg")
+RM_TRIGGERS = ("limited edition", "ep", "lp", "album", "single", "vinyl", "compiled by", "presented by", "free", "bonus", "various -", "cd")  # noqa
 # fmt: off
+# (pattern, replacement, trigger strings) - pattern can only match when at least one
+# of the trigger strings is found in the lowercase name
 CLEAN_PATTERNS = [
-    (re.compile(rf"(([\[(])|(^| ))\*?({'|'.join(rm_strings)})(?(2)[])]|([- ]|$))", re.I), ""),       # noqa
-    (re.compile(r" -(\S)"), r" - \1"),                    # hi -bye          -> hi - bye
-    (re.compile(r"(\S)- "), r"\1 - "),                    # hi- bye          -> hi - bye
-    (re.compile(r"  +"), " "),                            # hi  bye          -> hi bye
-    (re.compile(r"(- )?\( *"), "("),                      # hi - ( bye)      -> hi (bye)
-    (re.compile(r" \)+|(\)+$)"), ")"),                    # hi (bye ))       -> hi (bye)
-    (re.compile(r"- Reworked"), "(Reworked)"),            # bye - Reworked   -> bye (Reworked)    # noqa
-    (re.compile(rf"(\({REMIX.pattern})$", re.I), r"\1)"),    # bye - (Some Mix  -> bye - (Some Mix)  # noqa
-    (re.compile(rf"- *({REMIX.pattern})$", re.I), r"(\1)"),  # bye - Some Mix   -> bye (Some Mix)    # noqa
-    (re.compile(r'(^|- )[“"]([^”"]+)[”"]( \(|$)'), r"\1\2\3"),   # "bye" -> bye; hi - "bye" -> hi - bye  # noqa
-    (re.compile(r"\((the )?(remixes)\)", re.I), r"\2"),   # Album (Remixes)  -> Album Remixes     # noqa
-    (re.compile(r"examine-.+CD\d+_([^_-]+)[_-](.*)"), split_artist_title),  # See https://examine-archive.bandcamp.com/album/va-examine-archive-international-sampler-xmn01 # noqa
+    (re.compile(rf"(([\[(])|(^| ))\*?({'|'.join(rm_strings)})(?(2)[])]|([- ]|$))", re.I), "", RM_TRIGGERS),  # noqa
+    (re.compile(r" -(\S)"), r" - \1", (" -",)),                  # hi -bye -> hi - bye
+    (re.compile(r"(\S)- "), r"\1 - ", ("- ",)),                  # hi- bye -> hi - bye
+    (re.compile(r"  +"), " ", ("  ",)),                          # hi  bye -> hi bye
+    (re.compile(r"(- )?\( *"), "(", ("(",)),                     # hi - ( bye) -> hi (bye)
+    (re.compile(r" \)+|(\)+$)"), ")", (")",)),                   # hi (bye )) -> hi (bye)
+    (re.compile(r"- Reworked"), "(Reworked)", ("- reworked",)),  # bye - Reworked   -> bye (Reworked)    # noqa
+    (re.compile(rf"(\({REMIX.pattern})$", re.I), r"\1)", REMIX_WORDS),    # bye - (Some Mix  -> bye - (Some Mix)  # noqa
+    (re.compile(rf"- *({REMIX.pattern})$", re.I), r"(\1)", REMIX_WORDS),  # bye - Some Mix   -> bye (Some Mix)    # noqa
+    (re.compile(r'(^|- )[“"]([^”"]+)[”"]( \(|$)'), r"\1\2\3", ('"', "“")),   # "bye" -> bye; hi - "bye" -> hi - bye  # noqa
+    (re.compile(r"\((the )?(remixes)\)", re.I), r"\2", ("remixes",)),   # Album (Remixes)  -> Album Remixes     # noqa
+    (re.compile(r"examine-.+CD\d+_([^_-]+)[_-](.*)"), split_artist_title, ("examine-",)),  # See https://examine-archive.bandcamp.com/album/va-examine-archive-international-sampler-xmn01 # noqa
 ]
 # fmt: on
 
@@ -163,48 +298,42 @@ class Helpers:
         """Split artists taking into account delimiters such as ',', '+', 'x', 'X' etc.
         Note: featuring artists are removed since they are not main artists.
         """
-        no_ft_artists = (PATTERNS["ft"].sub("", a) for a in artists)
-        split = map(PATTERNS["split_artists"].split, ordset(no_ft_artists))
-        split_artists = ordset(map(str.strip, chain(*split))) - {"", "more"}
-
-        for artist in list(split_artists):
-            # ' & ' or ' X ' may be part of single artist name, so we need to be careful
-            # here. We check whether any of the split artists appears on their own and
-            # only split then
-            for char in "X&":
-                subartists = artist.split(f" {char} ")
-                if len(subartists) > 1 and any(s in split_artists for s in subartists):
-                    split_artists.discard(artist)  # type: ignore[attr-defined]
-                    split_artists.update(subartists)  # type: ignore[attr-defined]
-        return list(split_artists)
+        return list(split_unique_artists(tuple(artists)))
 
     @staticmethod
-    @lru_cache(maxsize=None)
+    @digest_cache(maxsize=1024)
     def parse_catalognum(
         album="", disctitle="", description="", label="", artistitles=""
     ):
         # type: (str, str, str, str, str) -> str
         """Try getting the catalog number looking at text from various fields."""
-        cases = [
-            (CATNUM_PAT["header"], description),
-            (CATNUM_PAT["anywhere"], disctitle),
-            (CATNUM_PAT["anywhere"], album),
-            (CATNUM_PAT["start_end"], description),
-            (CATNUM_PAT["anywhere"], description),
-        ]
-        if label:
-            pat = re.compile(LABEL_CATNUM.format(re.escape(label)), re.VERBOSE)
-            cases.append((pat, "\n".join((album, disctitle, description))))
-
-        def find(pat: Pattern[str], string: str) -> str:
-            """Return the match.
+        album, disctitle = album[:MAX_NAME_LENGTH], disctitle[:MAX_NAME_LENGTH]
+        description = bound_lines(description)
+
+        def candidates() -> Iterator[Iterable[str]]:
+            """Yield catalogue number candidates from each source in priority order.
+
+            Description is scanned for 'start_end' and 'anywhere' catalogue numbers
+            in a single pass, and only if nothing is found in the names.
+            """
+            yield find_catalognums(description, "header")
+            yield find_catalognums(disctitle, "anywhere")
+            yield find_catalognums(album, "anywhere")
+            matches = scan_catalognums(description, ("start_end", "anywhere"))
+            yield (m.catalognum for m in matches if m.kind == "start_end")
+            yield (m.catalognum for m in matches if m.kind == "anywhere")
+            if label:
+                text = "\n".join((album, disctitle, description))
+                yield (m.group(1) for m in label_catnum(label).finditer(text))
+
+        def find(catnums: Iterable[str]) -> str:
+            """Return the first legitimate catalogue number.
 
             It is legitimate if it is
             * not found in any of the track artists or titles
             * made of the label name when it has a space and is shorter than 6 chars
             """
-            for m in pat.finditer(string):
-                catnum = m.group(1).strip()
+            for catnum in map(str.strip, catnums):
                 if catnum.lower() not in artistitles:
                     if " " in catnum:
                         first = catnum.split()[0].lower()
@@ -213,16 +342,22 @@ class Helpers:
                     return catnum
             return ""
 
-        try:
-            return next(filter(None, starmap(find, cases)))
-        except StopIteration:
-            return ""
+        return next(filter(None, map(find, candidates())), "")
 
     @staticmethod
+    @registered_lru_cache(maxsize=2048)
     def clean_name(name: str) -> str:
-        """Both album and track names are cleaned using these patterns."""
-        for pat, repl in CLEAN_PATTERNS:
-            name = pat.sub(repl, name).strip()
+        """Both album and track names are cleaned using these patterns.
+
+        A pattern is skipped when none of its trigger strings are found in the name,
+        therefore most names never reach the regex engine.
+        """
+        lowered = to_lower(name)
+        for pat, repl, triggers in CLEAN_PATTERNS:
+            if any(t in lowered for t in triggers):
+                name = pat.sub(repl, name)
+                lowered = to_lower(name)
+            name = name.strip()
         return name
 
     @staticmethod
@@ -250,55 +385,13 @@ class Helpers:
 
              "garage house" is preferred over "house".
         """
-        valid_mb_genre = partial(contains, GENRES)
-        label_name = label.lower().replace(" ", "")
-
-        def is_label_name(kw: str) -> bool:
-            return kw.replace(" ", "") == label_name and not valid_mb_genre(kw)
-
-        def is_included(kw: str) -> bool:
-            return any(re.search(x, kw) for x in config["always_include"])
-
-        def valid_for_mode(kw: str) -> bool:
-            if config["mode"] == "classical":
-                return valid_mb_genre(kw)
-
-            words = map(str.strip, re.split("[ -]", kw))
-            if config["mode"] == "progressive":
-                return valid_mb_genre(kw) or all(map(valid_mb_genre, words))
-
-            return valid_mb_genre(kw) or valid_mb_genre(list(words)[-1])
-
-        unique_genres: ordset[str] = ordset()
-        # expand badly delimited keywords
-        split_kw = partial(re.split, r"[.] | #| - ")
-        for kw in chain.from_iterable(map(split_kw, keywords)):
-            # remove full stops and hashes and ensure the expected form of 'and'
-            _kw = re.sub("[.#]", "", str(kw)).replace("&", "and")
-            if not is_label_name(_kw) and (is_included(_kw) or valid_for_mode(_kw)):
-                unique_genres.add(_kw)
-
-        def within_another_genre(genre: str) -> bool:
-            """Check if this genre is part of another genre.
-
-            Remove spaces and dashes from the rest of genres and check if any of them
-            contain the given genre.
-
-            This is so that 'dark folk' is kept while 'darkfolk' is removed, and not
-            the other way around.
-            """
-            others = unique_genres - {genre}
-            others |= {x.replace(" ", "").replace("-", "") for x in others}
-            return any(genre in x for x in others)
-
-        return (g for g in unique_genres if not within_another_genre(g))
+        return Genre.from_config(config).get(keywords, label)
 
     @staticmethod
     def unpack_props(obj: JSONDict) -> JSONDict:
-        """Add all 'additionalProperty'-ies to the parent dictionary."""
-        for prop in obj.get("additionalProperty") or []:
-            obj[prop["name"]] = prop["value"]
-        return obj
+        """Return the dictionary with all its 'additionalProperty'-ies added to it."""
+        props = obj.get("additionalProperty") or []
+        return {**obj, **{prop["name"]: prop["value"] for prop in props}}
 
     @staticmethod
     def get_media_formats(format_list: List[JSONDict]) -> List[MediaInfo]:
@@ -351,14 +444,25 @@ class Helpers:
         return formats
 
     @staticmethod
-    def add_track_alts(album: AlbumInfo, comments: str) -> AlbumInfo:
+    @digest_cache(maxsize=256)
+    def parse_track_alts(comments: str) -> Tuple[Tuple[str, ...], Dict[int, int]]:
+        """Return unique track alts found in the comments and track counts by medium.
+
+        A track belongs to the medium of its (uppercase) side letter, for example,
+        'C2' is the second track on the second medium.
+        """
         # using an ordered set here in case of duplicates
-        track_alts = ordset(PATTERNS["track_alt"].findall(comments))
+        track_alts = tuple(ordset(PATTERNS["track_alt"].findall(comments)))
+        sides = Counter(alt[0] for alt in track_alts)
+        totals = {
+            medium: sum(sides[side] for side in medium_sides)
+            for medium, medium_sides in MEDIUM_SIDES.items()
+        }
+        return track_alts, totals
 
-        @lru_cache(maxsize=None)
-        def get_medium_total(medium: int) -> int:
-            starts = {1: "AB", 2: "CD", 3: "EF", 4: "GH", 5: "IJ"}[medium]
-            return len(re.findall(rf"^[{starts}]", "\n".join(track_alts), re.M))
+    @staticmethod
+    def add_track_alts(album: AlbumInfo, comments: str) -> AlbumInfo:
+        track_alts, medium_totals = Helpers.parse_track_alts(comments)
 
         medium = 1
         medium_index = 1
@@ -367,7 +471,7 @@ class Helpers:
                 track.track_alt = track_alt
                 track.medium_index = medium_index
                 track.medium = medium
-                track.medium_total = get_medium_total(medium)
+                track.medium_total = medium_totals[medium]
                 if track.medium_index == track.medium_total:
                     medium += 1
                     medium_index = 1
@@ -1,21 +1,30 @@
-from functools import lru_cache
 from html import unescape
 from urllib.parse import urlsplit
 
 from beets import __version__
 import httpx
 
+from .cache import digest_cache
+
 HTTPError = httpx.HTTPError
 
 USER_AGENT = f"beets/{__version__} +https://beets.io/"
+# the number of pages to keep, see the 'page_cache_size' option
+PAGE_CACHE_SIZE = 128
 
 _client = httpx.Client(headers={"User-Agent": USER_AGENT})
 
-@lru_cache(maxsize=None)
-def http_get_text(url: str) -> str:
-    """Return text contents of the url."""
+
+def http_get_text_uncached(url: str) -> str:
+    """Return text contents of the url, without looking it up in the cache."""
 
     response = _client.get(url)
     response.raise_for_status()
 
     return unescape(response.text)
+
+
+@digest_cache(maxsize=PAGE_CACHE_SIZE)
+def http_get_text(url: str) -> str:
+    """Return text contents of the url."""
+    return http_get_text_uncached(url)
@@ -1,10 +1,12 @@
 """Module for parsing bandcamp metadata."""
 
+import hashlib
 import itertools as it
 import json
 import operator as op
 import re
 from collections import Counter
+from dataclasses import dataclass
 from datetime import date, datetime
 from functools import cached_property, partial
 from typing import Any, Dict, Iterable, List, Optional, Set
@@ -17,7 +19,9 @@ from packaging import version
 from pycountry import countries, subdivisions
 
 from .album import AlbumName
-from .helpers import PATTERNS, Helpers, MediaInfo
+from .cache import digest_cache
+from .helpers import PATTERNS, Helpers, MediaInfo, is_parseable
+from .metrics import stage
 from .track import Track
 from .tracks import Tracks
 
@@ -41,6 +45,50 @@ DIGI_MEDIA = "Digital Media"
 VA = "Various Artists"
 
 
+@dataclass
+class Release:
+    """Release data that does not depend on the plugin configuration.
+
+    It is cached by the page HTML, therefore a release that is fetched again, for
+    example, after the configuration has changed, does not need to be parsed again.
+    """
+
+    meta: JSONDict
+
+    @staticmethod
+    @digest_cache(maxsize=128)
+    def from_html(html: str) -> "Release":
+        with stage("metadata"):
+            return Release.parse_html(html)
+
+    @staticmethod
+    def parse_html(html: str) -> "Release":
+        try:
+            meta = re.search(PATTERNS["meta"], html.replace("\u200b", "")).group()  # type: ignore[union-attr]  # noqa
+        except AttributeError as exc:
+            raise AttributeError("Could not find release metadata JSON") from exc
+        else:
+            return Release(json.loads(meta))
+
+    @cached_property
+    def content_hash(self) -> str:
+        """Hash of the release metadata, which does not depend on the page layout."""
+        data = json.dumps(self.meta, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    @cached_property
+    def media_formats(self) -> List[MediaInfo]:
+        return Helpers.get_media_formats(
+            (self.meta.get("inAlbum") or self.meta).get("albumRelease") or []
+        )
+
+    @cached_property
+    def tracks(self) -> Tracks:
+        """Parsed tracks, which must be copied before they are adjusted."""
+        with stage("tracks"):
+            return Tracks.from_json(self.meta)
+
+
 class Metaguru(Helpers):
     _singleton = False
     va_name = VA
@@ -49,31 +97,43 @@ class Metaguru(Helpers):
     meta: JSONDict
     config: JSONDict
     media_formats: List[MediaInfo]
-    _tracks: Tracks
-    _album_name: AlbumName
 
-    def __init__(self, meta: JSONDict, config: Optional[JSONDict] = None) -> None:
+    def __init__(
+        self,
+        meta: JSONDict,
+        config: Optional[JSONDict] = None,
+        release: Optional[Release] = None,
+    ) -> None:
         self.meta = meta
-        self.media_formats = self.get_media_formats(
-            (meta.get("inAlbum") or meta).get("albumRelease") or []
-        )
+        self.release = release or Release(meta)
+        self.media_formats = self.release.media_formats
         if self.media_formats:
             self.media = self.media_formats[0]
         self.config = config or {}
-        self.va_name = beets_config["va_name"].as_str() or self.va_name
-        self._tracks = Tracks.from_json(meta)
-        self._album_name = AlbumName(
-            meta.get("name") or "", self.all_media_comments, self._tracks.album
+        va_name = self.config.get("va_name")
+        if va_name is None:
+            va_name = beets_config["va_name"].as_str()
+        self.va_name = va_name or self.va_name
+        # fail early if this is not a release: every release has a label or publisher
+        self.get_label(meta)
+
+    @cached_property
+    def _tracks(self) -> Tracks:
+        """Tracks are only parsed once they are needed, see `image`, for example."""
+        return self.release.tracks.copy()
+
+    @cached_property
+    def _album_name(self) -> AlbumName:
+        return AlbumName(
+            self.meta.get("name") or "",
+            self.all_media_comments,
+            self._tracks.album,
         )
 
     @classmethod
     def from_html(cls, html: str, config: Optional[JSONDict] = None) -> "Metaguru":
-        try:
-            meta = re.search(PATTERNS["meta"], html.replace("\u200b", "")).group()  # type: ignore[union-attr]  # noqa
-        except AttributeError as exc:
-            raise AttributeError("Could not find release metadata JSON") from exc
-        else:
-            return cls(json.loads(meta), config)
+        release = Release.from_html(html)
+        return cls(release.meta, config, release)
 
     @cached_property
     def excluded_fields(self) -> Set[str]:
@@ -123,6 +183,9 @@ class Metaguru(Helpers):
     def original_albumartist(self) -> str:
         m = re.search(r"Artists?:([^\n]+)", self.all_media_comments)
         aartist = m.group(1).strip() if m else self.meta["byArtist"]["name"]
+        if not is_parseable(aartist):
+            return aartist
+
         return re.sub(r" +// +", ", ", aartist)
 
     @cached_property
@@ -394,13 +457,14 @@ class Metaguru(Helpers):
             kws = filter(exclude_style, kws)
 
         genre_cfg = self.config["genre"]
-        genres = self.get_genre(kws, genre_cfg, self.label)
-        if genre_cfg["capitalize"]:
-            genres = map(str.capitalize, genres)
-        if genre_cfg["maximum"]:
-            genres = it.islice(genres, genre_cfg["maximum"])
+        with stage("genre"):
+            genres = self.get_genre(kws, genre_cfg, self.label)
+            if genre_cfg["capitalize"]:
+                genres = map(str.capitalize, genres)
+            if genre_cfg["maximum"]:
+                genres = it.islice(genres, genre_cfg["maximum"])
 
-        return ", ".join(sorted(genres)).strip() or None
+            return ", ".join(sorted(genres)).strip() or None
 
     @property
     def _common(self) -> JSONDict:
@@ -453,6 +517,10 @@ class Metaguru(Helpers):
 
     @cached_property
     def singleton(self) -> TrackInfo:
+        with stage("albums"):
+            return self.get_singleton()
+
+    def get_singleton(self) -> TrackInfo:
         self._singleton = True
         self.media = self.media_formats[0]
         track = self._trackinfo(self.tracks.first)
@@ -496,4 +564,5 @@ class Metaguru(Helpers):
     @cached_property
     def albums(self) -> List[AlbumInfo]:
         """Return album for the appropriate release format."""
-        return list(map(self.get_media_album, self.media_formats))
+        with stage("albums"):
+            return list(map(self.get_media_album, self.media_formats))
@@ -0,0 +1,189 @@
+"""Module with optional instrumentation of candidate lookups.
+
+Instrumentation is disabled by default. Once a sink is configured, every
+`candidates` and `item_candidates` call records
+
+* wall time spent in each stage, for example, `search`, `fetch` or `tracks`
+* the number of requests, fetched bytes and responses found in the cache
+* the number of returned candidates
+
+and sends the record to the sink once the lookup is over. Stages may be nested:
+`fetch` time, for example, is also included in the `search` stage that made the
+request.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter, time
+from typing import Any, Dict, Iterator, Optional
+
+JSONDict = Dict[str, Any]
+
+SINKS = ("log", "jsonl", "prometheus")
+
+
+@dataclass
+class Lookup:
+    """Measurements of a single candidates lookup."""
+
+    call: str
+    query: str
+    timestamp: float = field(default_factory=time)
+    duration: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+    bytes_fetched: int = 0
+    cache_hits: int = 0
+    candidates: int = 0
+
+    @property
+    def summary(self) -> str:
+        stages = ", ".join(f"{k} {v:.3f}s" for k, v in self.stages.items())
+        return (
+            f"{self.call} '{self.query}': {self.candidates} candidates in"
+            f" {self.duration:.3f}s ({stages or 'no stages'}), {self.requests} requests"
+            f" ({self.cache_hits} cached), {self.bytes_fetched} bytes"
+        )
+
+
+_current: ContextVar[Optional[Lookup]] = ContextVar("lookup", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the time spent within this block to the current lookup stage."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        current.stages[name] = current.stages.get(name, 0.0) + elapsed
+
+
+def record_fetch(text: str, cached: bool) -> None:
+    """Record a fetched response in the current lookup."""
+    current = _current.get()
+    if current is not None:
+        current.requests += 1
+        current.bytes_fetched += len(text.encode())
+        current.cache_hits += cached
+
+
+class Sink(ABC):
+    """Destination for the lookup measurements."""
+
+    @abstractmethod
+    def emit(self, lookup: Lookup) -> None:
+        """Send the measurements of a finished lookup."""
+
+
+class LogSink(Sink):
+    """Log a single line summary of each lookup."""
+
+    def __init__(self, log: logging.Logger) -> None:
+        self.log = log
+
+    def emit(self, lookup: Lookup) -> None:
+        self.log.log(logging.INFO, "{}", lookup.summary)
+
+
+class JSONLinesSink(Sink):
+    """Append each lookup to a file as a JSON object on its own line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def emit(self, lookup: Lookup) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(lookup)) + "\n")
+
+
+class PrometheusSink(Sink):
+    """Keep running totals and write them in Prometheus text exposition format.
+
+    The file is replaced after every lookup, therefore it can be read by the node
+    exporter textfile collector at any time.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.lookups: Counter[str] = Counter()
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        self.totals: Dict[str, float] = defaultdict(float)
+
+    def emit(self, lookup: Lookup) -> None:
+        self.lookups[lookup.call] += 1
+        for name, seconds in lookup.stages.items():
+            self.stage_seconds[name] += seconds
+        for name, value in {
+            "lookup_seconds": lookup.duration,
+            "requests": lookup.requests,
+            "fetched_bytes": lookup.bytes_fetched,
+            "cache_hits": lookup.cache_hits,
+            "candidates": lookup.candidates,
+        }.items():
+            self.totals[name] += value
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def render(self) -> str:
+        lines = ["# TYPE beetcamp_lookups_total counter"]
+        lines.extend(
+            f'beetcamp_lookups_total{{call="{call}"}} {count}'
+            for call, count in sorted(self.lookups.items())
+        )
+        lines.append("# TYPE beetcamp_stage_seconds_total counter")
+        lines.extend(
+            f'beetcamp_stage_seconds_total{{stage="{name}"}} {seconds:.6f}'
+            for name, seconds in sorted(self.stage_seconds.items())
+        )
+        for name, value in sorted(self.totals.items()):
+            lines.append(f"# TYPE beetcamp_{name}_total counter")
+            lines.append(f"beetcamp_{name}_total {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def make_sink(config: JSONDict, log: logging.Logger) -> Optional[Sink]:
+    """Return the sink configured under 'instrumentation', or None if it is off."""
+    kind = config.get("sink") or ""
+    if not kind:
+        return None
+    if kind not in SINKS:
+        raise ValueError(f"Unknown instrumentation sink {kind!r}, use one of {SINKS}")
+
+    if kind == "log":
+        return LogSink(log)
+    if not config.get("path"):
+        raise ValueError(f"Instrumentation sink {kind!r} requires a 'path'")
+
+    return (JSONLinesSink if kind == "jsonl" else PrometheusSink)(config["path"])
+
+
+@contextmanager
+def lookup(call: str, query: str, sink: Sink) -> Iterator[Lookup]:
+    """Measure the lookup within this block and send the result to the sink."""
+    current = Lookup(call, query)
+    token = _current.set(current)
+    start = perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration = perf_counter() - start
+        _current.reset(token)
+        sink.emit(current)
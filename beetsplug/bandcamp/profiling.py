@@ -0,0 +1,150 @@
+"""Module with the profiling support for the command line application.
+
+Profiled functions are split into two phases: the network phase includes the HTTP
+client, TLS and socket functions, and the parse phase includes everything else.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import pstats
+import re
+import sys
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+from .cache import cache_stats
+
+T = TypeVar("T")
+JSONDict = Dict[str, Any]
+# pstats function key: (filename, line number, function name)
+FuncKey = Tuple[str, int, str]
+
+NETWORK_PAT = re.compile(
+    r"httpx|httpcore|h11|\bh2\b|ssl|socket|selectors|bandcamp[/\\]http\.py"
+)
+PHASES = ("network", "parse")
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def get_phase(func: FuncKey) -> str:
+    filename, _, name = func
+    return "network" if NETWORK_PAT.search(f"{filename}:{name}") else "parse"
+
+
+def func_name(func: FuncKey) -> str:
+    filename, line, name = func
+    if filename == "~":  # built-in function
+        return name
+    return f"{name} ({filename}:{line})"
+
+
+class Profile:
+    """Profiling results of a single function call."""
+
+    def __init__(self, profiler: cProfile.Profile) -> None:
+        self.stats = pstats.Stats(profiler)
+        # function -> (primitive calls, total calls, own time, cumulative time, callers)
+        self.funcs: Dict[FuncKey, Tuple[int, int, float, float, Any]] = (
+            self.stats.stats  # type: ignore[attr-defined]
+        )
+
+    def phase_times(self) -> Dict[str, float]:
+        """Return the time spent within each phase, excluding called functions."""
+        times = dict.fromkeys(PHASES, 0.0)
+        for func, (_, _, tottime, _, _) in self.funcs.items():
+            times[get_phase(func)] += tottime
+        return times
+
+    def top(self, phase: str, count: int) -> List[Tuple[FuncKey, int, float, float]]:
+        """Return the functions of the phase with the highest cumulative time."""
+        funcs = [
+            (func, ncalls, tottime, cumtime)
+            for func, (_, ncalls, tottime, cumtime, _) in self.funcs.items()
+            if get_phase(func) == phase
+        ]
+        return sorted(funcs, key=lambda x: x[3], reverse=True)[:count]
+
+    def report(self, count: int = 15) -> str:
+        times = self.phase_times()
+        total = sum(times.values()) or 1.0
+        summary = ", ".join(
+            f"{phase} {secs:.3f}s ({secs / total:.0%})" for phase, secs in times.items()
+        )
+        lines = [f"Total {total:.3f}s: {summary}"]
+        for phase in PHASES:
+            lines.extend(("", f"Top {phase} functions by cumulative time"))
+            lines.append(f"{'ncalls':>8} {'tottime':>8} {'cumtime':>8}  function")
+            lines.extend(
+                f"{ncalls:>8} {tottime:>8.3f} {cumtime:>8.3f}  {func_name(func)}"
+                for func, ncalls, tottime, cumtime in self.top(phase, count)
+            )
+        return "\n".join(lines)
+
+    def speedscope(self, name: str) -> JSONDict:
+        """Return the profile in speedscope format.
+
+        cProfile does not record call stacks, therefore each function is represented
+        by a sample with a two level stack, phase -> function, weighted by the time
+        spent within that function.
+        """
+        frames: List[JSONDict] = [{"name": phase} for phase in PHASES]
+        samples, weights = [], []
+        for func, (_, _, tottime, _, _) in self.funcs.items():
+            if tottime > 0:
+                samples.append([PHASES.index(get_phase(func)), len(frames)])
+                weights.append(tottime)
+                frames.append({"name": func_name(func)})
+
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "beetcamp",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def save(self, path: str) -> None:
+        """Write speedscope JSON if the path ends with '.json', otherwise pstats."""
+        if path.endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.speedscope(name=path), f)
+        else:
+            self.stats.dump_stats(path)
+
+
+def cache_report() -> str:
+    """Return hit and miss counts of the registered caches."""
+    lines = ["Caches", f"{'hits':>8} {'misses':>8} {'size':>11}  cache"]
+    lines.extend(
+        f"{info.hits:>8} {info.misses:>8} {info.currsize:>5}/{info.maxsize:<5}  {name}"
+        for name, info in sorted(cache_stats().items())
+    )
+    return "\n".join(lines)
+
+
+def profile_call(func: Callable[[], T]) -> Tuple[T, Profile]:
+    """Call the function under cProfile and return its result and the profile."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func)
+    return result, Profile(profiler)
+
+
+def run_profiled(func: Callable[[], T], output: str | None = None) -> T:
+    """Call the function, print the profile report to stderr and save it if needed."""
+    result, profile = profile_call(func)
+    print(profile.report(), cache_report(), sep="\n\n", file=sys.stderr)
+    if output:
+        profile.save(output)
+        print(f"\nProfile saved to {output}", file=sys.stderr)
+    return result
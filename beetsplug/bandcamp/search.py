@@ -10,7 +10,7 @@ from urllib.parse import quote_plus
 from .http import http_get_text
 
 JSONDict = Dict[str, Any]
-SEARCH_URL = "https://bandcamp.com/search?page={}&q={}"
+SEARCH_URL = "https://bandcamp.com/search"
 
 
 def _f(field: str) -> str:
@@ -31,7 +31,7 @@ RELEASE_PATTERNS = [
     re.compile(r">https://bandcamp\.(?P<label>[^.<]+)\.[^<]+<"),
     re.compile(r">https://(?P<label>[^.]+)\.bandcamp\.[^<]+<"),
     re.compile(r">https://(?P<label>(?!bandcamp)[^/]+)\.[^<]+<"),
-    re.compile(r">(?P<url>https://[^<]+)<"),
+    re.compile(r">(?P<url>https?://[^<]+)<"),
 ]
 
 
@@ -100,10 +100,14 @@ def search_bandcamp(
     search_type: str = "",
     page: int = 1,
     get: Callable[[str], str] = http_get_text,
+    search_url: str = "",
     **kwargs: Any,
 ) -> List[JSONDict]:
-    """Return a list with item JSONs of type search_type matching the query."""
-    url = SEARCH_URL.format(page, quote_plus(query))
+    """Return a list with item JSONs of type search_type matching the query.
+
+    Search goes to `SEARCH_URL` unless another `search_url` is given.
+    """
+    url = f"{search_url or SEARCH_URL}?page={page}&q={quote_plus(query)}"
     if search_type:
         url += "&item_type=" + search_type
     kwargs["name"] = query
@@ -0,0 +1,273 @@
+"""Module for the `beet bcsync` command which updates Bandcamp albums in bulk.
+
+Like `mbsync`, it looks up each album again and applies the updated metadata, but
+
+* releases are fetched and parsed concurrently by a bounded pool of workers
+* updates are applied in batches, one database transaction per batch
+* releases whose metadata has not changed since the last sync are skipped: the hash
+  of the release metadata is stored in the `bandcamp_hash` flexible attribute of the
+  album, therefore an unchanged release costs one request and one hash
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from optparse import Values
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+from beets import autotag, library, ui, util
+from beets.plugins import apply_item_changes
+
+from .http import HTTPError, http_get_text_uncached
+from .metaguru import Metaguru
+
+if TYPE_CHECKING:
+    from beets.autotag.hooks import AlbumInfo, TrackInfo
+
+    from . import BandcampPlugin
+
+JSONDict = Dict[str, Any]
+T = TypeVar("T")
+R = TypeVar("R")
+
+HASH_FIELD = "bandcamp_hash"
+DEFAULT_JOBS = 4
+BATCH_SIZE = 100
+
+
+def bounded_map(
+    executor: Executor, func: Callable[[T], R], items: Iterable[T], window: int
+) -> Iterator[R]:
+    """Yield `func` results in order, keeping at most `window` items in flight.
+
+    Unlike `Executor.map`, items are only submitted as results are consumed, therefore
+    a large library does not end up in memory all at once.
+    """
+    futures: Deque[Future[R]] = deque()
+    for item in items:
+        futures.append(executor.submit(func, item))
+        if len(futures) >= window:
+            yield futures.popleft().result()
+
+    while futures:
+        yield futures.popleft().result()
+
+
+def track_mapping(
+    items: List[library.Item], info: AlbumInfo
+) -> Dict[library.Item, TrackInfo]:
+    """Map items to tracks by their URLs or else by their positions."""
+    by_id = {t.track_id: t for t in info.tracks}
+    by_position = {(t.medium, t.medium_index): t for t in info.tracks}
+    mapping = {}
+    for item in items:
+        track = by_id.get(item.mb_trackid) or by_position.get((item.disc, item.track))
+        if track:
+            mapping[item] = track
+
+    return mapping
+
+
+def changed_items(lib: library.Library, items: List[library.Item]) -> List[library.Item]:
+    """Show and return the items which differ from their stored versions.
+
+    Unlike `ui.show_model_changes` on its own, an empty value, for example, `None`
+    for a missing `track_alt` that is stored as an empty string, is not a change.
+    """
+    changed = []
+    for item in items:
+        old = lib.get_item(item.id)
+        if any(
+            (item.get(field) or None) != (old.get(field) or None)
+            for field in item.keys()
+            if field != "mtime"
+        ):
+            ui.show_model_changes(item, old)
+            changed.append(item)
+
+    return changed
+
+
+class Fetched(NamedTuple):
+    album: library.Album
+    hash: str = ""
+    albums: Optional[List[AlbumInfo]] = None
+    unchanged: bool = False
+
+
+class Sync:
+    """Fetch Bandcamp albums concurrently and apply their metadata in batches."""
+
+    def __init__(
+        self,
+        plugin: BandcampPlugin,
+        lib: library.Library,
+        move: bool = False,
+        pretend: bool = False,
+        write: bool = False,
+        force: bool = False,
+        jobs: int = DEFAULT_JOBS,
+        batch_size: int = BATCH_SIZE,
+    ) -> None:
+        self.plugin = plugin
+        self.lib = lib
+        self.move = move
+        self.pretend = pretend
+        self.write = write
+        self.force = force
+        self.jobs = jobs
+        self.batch_size = batch_size
+        # resolved once, before the workers start reading it
+        self.config: JSONDict = plugin.resolved_config
+        self.counts: Dict[str, int] = dict.fromkeys(
+            ("updated", "unchanged", "failed"), 0
+        )
+
+    def fetch(self, album: library.Album) -> Fetched:
+        """Fetch the album page and parse it unless the release has not changed.
+
+        Both the hash and the metadata come from the same page. Synced pages are not
+        looked up again, therefore they are not cached. This runs in a worker thread,
+        therefore it does not touch the library.
+        """
+        url = album.mb_albumid
+        fetched = Fetched(album)
+        try:
+            html = http_get_text_uncached(url)
+        except HTTPError as e:
+            self.plugin._info("Failed obtaining {}: {}", url, str(e))
+            return fetched
+
+        with self.plugin.handle_error(url):
+            guru = Metaguru.from_html(html, self.config)
+            _hash = guru.release.content_hash
+            if not self.force and _hash == album.get(HASH_FIELD):
+                fetched = Fetched(album, _hash, unchanged=True)
+            else:
+                fetched = Fetched(album, _hash, guru.albums)
+        return fetched
+
+    def apply(self, fetched: Fetched) -> None:
+        """Apply the fetched album metadata to the album and its items."""
+        if fetched.unchanged or not fetched.albums:
+            self.counts["unchanged" if fetched.unchanged else "failed"] += 1
+            return
+
+        album = fetched.album
+        items = list(album.items())
+        info = self.plugin._pick_album(fetched.albums, items[0].media if items else "")
+        autotag.apply_metadata(info, track_mapping(items, info))
+        changed = changed_items(self.lib, items)
+        updated = bool(changed) or fetched.hash != album.get(HASH_FIELD)
+        self.counts["updated" if updated else "unchanged"] += 1
+        if not updated:
+            return
+
+        self.plugin._info("Applying changes to {}", format(album))
+        for item in changed:
+            apply_item_changes(self.lib, item, self.move, self.pretend, self.write)
+        if not self.pretend:
+            self.store_album(album, changed, fetched.hash)
+
+    def store_album(
+        self, album: library.Album, changed: List[library.Item], _hash: str
+    ) -> None:
+        """Store the album with the hash of its release, updated to reflect its items."""
+        if changed:
+            for key in library.Album.item_keys:
+                album[key] = changed[-1][key]
+        album[HASH_FIELD] = _hash
+        album.store()
+        if changed and self.move and self.lib.directory in util.ancestry(
+            changed[0].path
+        ):
+            album.move()
+
+    def apply_batch(self, batch: List[Fetched]) -> None:
+        with self.lib.transaction():
+            for fetched in batch:
+                self.apply(fetched)
+
+    def run(self, albums: Iterable[library.Album]) -> Dict[str, int]:
+        """Sync the albums and return the number of updated, unchanged and failed."""
+        batch: List[Fetched] = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for fetched in bounded_map(
+                executor, self.fetch, albums, window=self.jobs * 4
+            ):
+                batch.append(fetched)
+                if len(batch) >= self.batch_size:
+                    self.apply_batch(batch)
+                    batch = []
+
+            if batch:
+                self.apply_batch(batch)
+
+        return self.counts
+
+
+def command(plugin: BandcampPlugin) -> ui.Subcommand:
+    cmd = ui.Subcommand("bcsync", help="update metadata of albums from Bandcamp")
+    cmd.parser.add_option(
+        "-p",
+        "--pretend",
+        action="store_true",
+        help="show all changes but do nothing",
+    )
+    cmd.parser.add_option(
+        "-m", "--move", action="store_true", dest="move", help="move files"
+    )
+    cmd.parser.add_option(
+        "-M", "--nomove", action="store_false", dest="move", help="don't move files"
+    )
+    cmd.parser.add_option(
+        "-W",
+        "--nowrite",
+        action="store_false",
+        default=None,
+        dest="write",
+        help="don't write updated metadata to files",
+    )
+    cmd.parser.add_option(
+        "-f",
+        "--force",
+        action="store_true",
+        help="update albums even if their Bandcamp release has not changed",
+    )
+    cmd.parser.add_option(
+        "-j",
+        "--jobs",
+        type="int",
+        default=DEFAULT_JOBS,
+        help=f"number of releases to fetch at once, {DEFAULT_JOBS} by default",
+    )
+
+    def func(lib: library.Library, opts: Values, args: List[str]) -> None:
+        albums = plugin.bandcamp_albums(lib, ui.decargs(args))
+        sync = Sync(
+            plugin,
+            lib,
+            move=ui.should_move(opts.move),
+            pretend=opts.pretend,
+            write=ui.should_write(opts.write),
+            force=opts.force,
+            jobs=max(opts.jobs, 1),
+        )
+        counts = sync.run(albums)
+        ui.print_(", ".join(f"{count} {name}" for name, count in counts.items()))
+
+    cmd.func = func
+    return cmd
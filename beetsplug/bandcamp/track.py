@@ -1,11 +1,22 @@
 """Module with a single track parsing functionality."""
 
 import re
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass
 from functools import cached_property
 from typing import Dict, List, Optional, Tuple
 
-from .helpers import CATNUM_PAT, PATTERNS, REMIX, Helpers, JSONDict
+from .cache import registered_lru_cache
+from .helpers import (
+    PATTERNS,
+    REMIX,
+    Helpers,
+    JSONDict,
+    has_ft,
+    is_parseable,
+    scan_catalognums,
+    to_lower,
+)
 
 digiwords = r"""
     # must contain at least one of
@@ -17,7 +28,7 @@ digiwords = r"""
     """
 DIGI_ONLY_PATTERN = re.compile(
     rf"""
-(\s|[^][()\w])*  # space or anything that is not a parens or an alphabetical char
+[^][()\w]*  # space or anything that is not a parens or an alphabetical char
 (
       (^{digiwords}[.:\d\s]+\s)     # begins with 'Bonus.', 'Bonus 1.' or 'Bonus :'
  | [\[(]{digiwords}[\])]\W*         # delimited by brackets, '[Bonus]', '(Bonus) -'
@@ -29,6 +40,8 @@ DIGI_ONLY_PATTERN = re.compile(
     """,
     re.I | re.VERBOSE,
 )
+# DIGI_ONLY_PATTERN cannot match unless the name contains one of these
+DIGI_ONLY_WORDS = ("bandcamp", "digi", "exclusive", "bonus", "bns", "unreleased")
 
 
 @dataclass
@@ -53,10 +66,11 @@ class Remix:
 
 @dataclass
 class Track:
-    json_item: JSONDict = field(default_factory=dict)
     track_id: str = ""
     index: Optional[int] = None
     json_artist: str = ""
+    duration: Optional[int] = None
+    lyrics: str = ""
 
     name: str = ""
     ft: str = ""
@@ -73,13 +87,18 @@ class Track:
 
         Return the clean name, and whether this track is digi-only.
         """
+        lowered = to_lower(name)
+        if not any(w in lowered for w in DIGI_ONLY_WORDS):
+            return name, False
+
         clean_name = DIGI_ONLY_PATTERN.sub("", name)
         return clean_name, clean_name != name
 
     @staticmethod
+    @registered_lru_cache(maxsize=1024)
     def split_ft(value: str) -> Tuple[str, str, str]:
         """Return ft artist, full ft string, and the value without the ft string."""
-        if m := PATTERNS["ft"].search(value):
+        if has_ft(value) and (m := PATTERNS["ft"].search(value)):
             grp = m.groupdict()
             return grp["ft_artist"], grp["ft"], value.replace(m.group(), "")
 
@@ -121,10 +140,10 @@ class Track:
         # check whether track name contains the catalog number within parens
         # or square brackets
         # see https://objection999x.bandcamp.com/album/eruption-va-obj012
-        m = CATNUM_PAT["delimited"].search(name)
-        if m:
-            result["catalognum"] = m.group(1)
-            name = name.replace(m.group(), "").strip()
+        catnums = scan_catalognums(name, ("delimited",))
+        if catnums:
+            result["catalognum"] = catnums[0].catalognum
+            name = name.replace(catnums[0].match, "").strip()
 
         # Remove leading index
         if index:
@@ -138,40 +157,52 @@ class Track:
 
         return {**result, **cls.get_featuring_artist(name, artist)}
 
+    @staticmethod
+    def parse_duration(json: JSONDict) -> Optional[int]:
+        try:
+            h, m, s = map(int, re.findall(r"\d+", json["duration"]))
+        except KeyError:
+            return None
+        else:
+            return h * 3600 + m * 60 + s
+
+    @staticmethod
+    def parse_lyrics(json: JSONDict) -> str:
+        try:
+            text: str = json["recordingOf"]["lyrics"]["text"]
+        except KeyError:
+            return ""
+        else:
+            return text.replace("\r", "")
+
     @classmethod
     def make(cls, json: JSONDict, name: str) -> "Track":
+        """Parse the track from its JSON, which is not kept once parsing is done.
+
+        Artist names repeat across tracks and releases, therefore they are interned.
+        A name or an artist that is too long to be parsed is kept as it is.
+        """
         try:
             artist = json["inAlbum"]["byArtist"]["name"]
         except KeyError:
             artist = json.get("byArtist", {}).get("name", "")
 
         index = json.get("position")
+        if is_parseable(name) and is_parseable(artist):
+            parsed = cls.parse_name(name, artist, index)
+        else:
+            parsed = {"name": name, "json_artist": artist, "ft_artist": ""}
         data = {
-            "json_item": json,
             "track_id": json["@id"],
             "index": index,
-            **cls.parse_name(name, artist, index),
+            "duration": cls.parse_duration(json),
+            "lyrics": cls.parse_lyrics(json),
+            **parsed,
         }
+        data["json_artist"] = sys.intern(data["json_artist"])
+        data["ft_artist"] = sys.intern(data["ft_artist"])
         return cls(**data)
 
-    @cached_property
-    def duration(self) -> Optional[int]:
-        try:
-            h, m, s = map(int, re.findall(r"\d+", self.json_item["duration"]))
-        except KeyError:
-            return None
-        else:
-            return h * 3600 + m * 60 + s
-
-    @cached_property
-    def lyrics(self) -> str:
-        try:
-            text: str = self.json_item["recordingOf"]["lyrics"]["text"]
-        except KeyError:
-            return ""
-        else:
-            return text.replace("\r", "")
-
     @cached_property
     def full_name(self) -> str:
         name = self.name
@@ -186,6 +217,9 @@ class Track:
         The extra complexity here is to ensure that it does not cut off a title
         that ends with ' - -', like in '(DJ) NICK JERSEY - 202memo - - -'.
         """
+        if not is_parseable(self.full_name):
+            return self.name
+
         parts = re.split(r" - (?![^\[(]+[])])", self.full_name)
         if len(parts) == 1:
             parts = self.full_name.split(" - ")
@@ -206,6 +240,9 @@ class Track:
     @cached_property
     def artist(self) -> str:
         """Return name without the title and the remixer."""
+        if not is_parseable(self.full_name):
+            return self.json_artist
+
         title_start_idx = self.full_name.rfind(self.title_without_remix)
         artist = Remix.PATTERN.sub("", self.full_name[:title_start_idx].strip(", -"))
         if self.remix:
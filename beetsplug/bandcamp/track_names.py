@@ -1,16 +1,12 @@
 """Module for parsing track names."""
 
-import operator as op
 import re
 from collections import Counter
 from contextlib import suppress
 from dataclasses import dataclass
-from functools import reduce
 from typing import Iterator, List, Optional, Tuple
 
-from ordered_set import OrderedSet
-
-from .helpers import CATNUM_PAT, REMIX
+from .helpers import REMIX, is_parseable, scan_catalognums
 
 
 @dataclass
@@ -89,36 +85,52 @@ class TrackNames:
         ]
 
     @staticmethod
-    def eject_common_catalognum(names: List[str]) -> Tuple[Optional[str], List[str]]:
+    def common_words(names: List[str]) -> List[str]:
+        """Return unique words found in every name, ordered as in the first name.
+
+        Each name is split once, and the search stops as soon as no word is shared.
+        """
+        if not names:
+            return []
+
+        first, *others = map(str.split, names)
+        common = set(first)
+        for words in others:
+            common.intersection_update(words)
+            if not common:
+                return []
+
+        return [w for w in dict.fromkeys(first) if w in common]
+
+    @staticmethod
+    def eject_common_catalognum(
+        names: List[str], common_words: List[str]
+    ) -> Tuple[Optional[str], List[str]]:
         """Return catalognum found in every track title.
 
-        1. Split each track name into words
-        2. Find the list of words that are common to all tracks
-        3. Check the *first* and the *last* word for the catalog number
+        1. Take the list of words that are common to all tracks
+        2. Check the *first* and the *last* word for the catalog number
            - If found, return it and remove it from every track name
         """
         catalognum = None
 
-        names_tokens = map(str.split, names)
-        common_words = reduce(op.and_, [OrderedSet(x) for x in names_tokens])
         if common_words:
-            matches = (CATNUM_PAT["anywhere"].search(common_words[i]) for i in [0, -1])
+            words = common_words[0], common_words[-1]
+            matches = ((scan_catalognums(w, ("anywhere",)), w) for w in words)
             with suppress(StopIteration):
-                catalognum, word = next((m.group(1), m.string) for m in matches if m)
+                catalognum, word = next((m[0].catalognum, w) for m, w in matches if m)
                 names = [n.replace(word, "").strip() for n in names]
 
         return catalognum, names
 
     @staticmethod
-    def parenthesize_remixes(names: List[str]) -> List[str]:
+    def parenthesize_remixes(names: List[str], common_words: List[str]) -> List[str]:
         """Reformat broken remix titles for an album with a single root title.
 
         1. Check whether this release has a single root title
         2. Find remixes that do not have parens around them
         3. Add parens
         """
-        names_tokens = map(str.split, names)
-        common_words = reduce(op.and_, [OrderedSet(x) for x in names_tokens])
         joined = " ".join(common_words)
         if joined in names:  # it is one of the track names (root title)
             remix_parts = [n.replace(joined, "").lstrip() for n in names]
@@ -142,14 +154,20 @@ class TrackNames:
 
     @classmethod
     def make(cls, original: List[str], label: str) -> "TrackNames":
-        names = cls.parenthesize_remixes(
-            cls.remove_label(
-                cls.normalize_delimiter(
-                    cls.remove_number_prefix(cls.split_quoted_titles(original))
-                ),
-                label,
-            )
+        # names that are too long to be parsed are left out and kept as they are
+        names = [n if is_parseable(n) else "" for n in original]
+        names = cls.remove_label(
+            cls.normalize_delimiter(
+                cls.remove_number_prefix(cls.split_quoted_titles(names))
+            ),
+            label,
         )
-        catalognum, names = cls.eject_common_catalognum(names)
+        common_words = cls.common_words(names)
+        with_remixes = cls.parenthesize_remixes(names, common_words)
+        if with_remixes != names:
+            names, common_words = with_remixes, cls.common_words(with_remixes)
+
+        catalognum, names = cls.eject_common_catalognum(names, common_words)
         album, names = cls.eject_album_name(names)
+        names = [n if is_parseable(o) else o for n, o in zip(names, original)]
         return cls(original, names, album=album, catalognum=catalognum)
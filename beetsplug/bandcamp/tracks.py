@@ -1,6 +1,7 @@
 """Module with tracks parsing functionality."""
 
 import itertools as it
+from copy import copy
 from dataclasses import dataclass
 from functools import cached_property
 from itertools import starmap
@@ -30,10 +31,15 @@ class Tracks:
             tracks = [meta]
 
         names = TrackNames.make(
-            [i.get("name", "") for i in tracks], Helpers.get_label(meta)
+            [i.get("name", "") for i in tracks],
+            Helpers.get_label(meta),
         )
         return cls(list(starmap(Track.make, zip(tracks, names))), names)
 
+    def copy(self) -> "Tracks":
+        """Return a copy whose tracks can be adjusted without affecting this one."""
+        return Tracks(list(map(copy, self.tracks)), self.names)
+
     @property
     def album(self) -> Optional[str]:
         return self.names.album
@@ -55,13 +61,17 @@ class Tracks:
         """Return all unique unsplit (original) main track artists."""
         return list(dict.fromkeys(j.artist for j in self.tracks))
 
-    @property
+    @cached_property
     def artists(self) -> List[str]:
         """Return all unique split main track artists.
 
         "Artist1 x Artist2" -> ["Artist1", "Artist2"]
+
+        Track artists are adjusted by `adjust_artists`, which resets this value.
         """
-        return list(dict.fromkeys(it.chain(*(j.artists for j in self.tracks))))
+        return list(
+            dict.fromkeys(it.chain.from_iterable(j.artists for j in self.tracks))
+        )
 
     @property
     def remixers(self) -> List[str]:
@@ -128,3 +138,5 @@ class Tracks:
             if not t.artist:
                 # default to the albumartist
                 t.artist = albumartist
+
+        self.__dict__.pop("artists", None)
@@ -0,0 +1,105 @@
+"""Record and replay HTTP transport for offline end-to-end tests and benchmarks.
+
+In record mode, requests are sent to the upstream transport (the network, by
+default) and each response is saved in the cassette directory as a gzipped JSON file
+named by the digest of the request method and URL. In replay mode, responses are
+read from the directory, and a request that has not been recorded fails.
+
+Use `use_transport` to send requests made by the plugin through the cassette:
+
+    with use_transport(Cassette(Path("tests/cassettes"), latency=0.05)):
+        plugin.album_for_id(url)
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from time import sleep
+from typing import Iterator
+
+import httpx
+from beetsplug.bandcamp import http
+
+
+class CassetteMiss(httpx.TransportError):
+    """The request has not been recorded."""
+
+
+class Cassette(httpx.BaseTransport):
+    """HTTP transport that records responses and replays them."""
+
+    def __init__(
+        self,
+        path: Path,
+        record: bool = False,
+        latency: float = 0.0,
+        upstream: httpx.BaseTransport | None = None,
+    ) -> None:
+        self.path = path
+        self.record = record
+        self.latency = latency
+        self.upstream = upstream or httpx.HTTPTransport()
+
+    def recording_path(self, request: httpx.Request) -> Path:
+        key = f"{request.method} {request.url}".encode()
+        return self.path / f"{hashlib.sha1(key).hexdigest()}.json.gz"
+
+    def save(self, request: httpx.Request, response: httpx.Response) -> None:
+        recording = {
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "text": response.text,
+        }
+        self.path.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.recording_path(request), "wt", encoding="utf-8") as f:
+            json.dump(recording, f)
+
+    def load(self, request: httpx.Request) -> httpx.Response:
+        try:
+            with gzip.open(self.recording_path(request), "rt", encoding="utf-8") as f:
+                recording = json.load(f)
+        except FileNotFoundError as exc:
+            msg = f"{request.method} {request.url} has not been recorded in {self.path}"
+            raise CassetteMiss(msg, request=request) from exc
+
+        return httpx.Response(
+            recording["status_code"],
+            headers={"content-type": recording["content_type"]},
+            content=recording["text"].encode(),
+            request=request,
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            sleep(self.latency)
+
+        if not self.record:
+            return self.load(request)
+
+        response = self.upstream.handle_request(request)
+        response.read()
+        self.save(request, response)
+        return response
+
+
+@contextmanager
+def use_transport(transport: httpx.BaseTransport) -> Iterator[None]:
+    """Send the plugin requests through the given transport within this block.
+
+    Responses are cached by the URL, therefore the cache is cleared on both ends.
+    """
+    client = http._client
+    http._client = httpx.Client(headers=client.headers, transport=transport)
+    http.http_get_text.cache_clear()
+    try:
+        yield
+    finally:
+        http._client.close()
+        http._client = client
+        http.http_get_text.cache_clear()
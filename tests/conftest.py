@@ -10,7 +10,8 @@ from os import path
 
 import pytest
 from beets.autotag.hooks import AlbumInfo, TrackInfo
-from beetsplug.bandcamp import DEFAULT_CONFIG
+from beetsplug.bandcamp import DEFAULT_CONFIG, BandcampPlugin
+from beetsplug.bandcamp.http import http_get_text
 from beetsplug.bandcamp.metaguru import ALBUMTYPES_LIST_SUPPORT
 from rich.console import Console
 
@@ -35,6 +36,13 @@ def pytest_addoption(parser):
         metavar="COMMIT",
         help="target name or short commit hash",
     )
+    parser.addoption(
+        "--parse-time-threshold",
+        type=float,
+        default=1.5,
+        metavar="RATIO",
+        help="flag releases that take RATIO times longer to parse than in base",
+    )
 
 
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
@@ -53,6 +61,17 @@ def beets_config():
     return deepcopy(DEFAULT_CONFIG)
 
 
+@pytest.fixture
+def plugin():
+    """Return a new plugin and remove the configuration set by the test afterwards."""
+    http_get_text.cache_clear()
+    pl = BandcampPlugin()
+    sources = pl.beets_config.sources
+    original = list(sources)
+    yield pl
+    sources[:] = original
+
+
 @pytest.fixture
 def digital_format():
     return {
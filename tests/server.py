@@ -0,0 +1,246 @@
+"""Local Bandcamp stand-in server for load tests.
+
+It serves release and track pages made of the JSON fixtures in `tests/json` under
+their original paths, for example, `/album/ute004`, `/search` results that link to
+them and a `/music` page that lists all of them, like a label discography does. Each
+request can be delayed, and a share of requests can be answered with '429 Too Many
+Requests' or '500 Internal Server Error'. Random failures are seeded, therefore a
+sequence of requests gets the same responses every time.
+
+Run it with
+
+    python -m tests.server --port 8000 --latency 0.2 --throttle-rate 0.1
+
+and point the plugin to it with
+
+    bandcamp:
+      search_url: http://127.0.0.1:8000/search
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+from argparse import ArgumentParser
+from collections import Counter
+from datetime import datetime
+from html import escape
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+JSONDict = Dict[str, Any]
+JSONS_DIR = Path(__file__).parent / "json"
+ITEM_TYPES = {"MusicAlbum": "a", "MusicRecording": "t"}
+ITEM_TYPE_NAMES = {"a": "ALBUM", "t": "TRACK"}
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<title>{title}</title>
+<script type="application/ld+json">
+{meta}
+</script>
+</head>
+<body></body>
+</html>
+"""
+# the parts of Bandcamp search result that the plugin reads, see `search.py`
+SEARCH_RESULT = """
+<li class="searchresult data-search">
+<a href="{url}?from=search">{url}</a>
+search_item_type="{item_type}">
+    {name}
+  by {artist}
+  <div class="released">
+    released {date}
+  </div>
+  <div class="itemtype">
+  {item_type_name}
+  </div>
+</li>
+"""
+MUSIC_GRID_ITEM = '<li class="music-grid-item"><a href="{path}">{name}</a></li>'
+
+
+def load_releases(path: Path) -> Dict[str, JSONDict]:
+    """Return the releases in the directory keyed by the path of their URL."""
+    releases = {}
+    for filepath in sorted(path.glob("*.json")):
+        meta = json.loads(re.sub(r"\n *", "", filepath.read_text(encoding="utf-8")))
+        releases[urlsplit(meta["@id"]).path] = meta
+    return releases
+
+
+class StandIn(ThreadingHTTPServer):
+    """HTTP server that pretends to be Bandcamp."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        json_dir: Path = JSONS_DIR,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        super().__init__((host, port), StandInHandler)
+        self.host = host
+        self.releases = load_releases(json_dir)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.responses: Counter[int] = Counter()
+        self.lock = Lock()
+        self.thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server_port}"
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.url}/search"
+
+    def pick_failure(self) -> Optional[HTTPStatus]:
+        """Return the status of the failure to respond with, if any."""
+        with self.lock:
+            chance = self.random.random()
+
+        if chance < self.throttle_rate:
+            return HTTPStatus.TOO_MANY_REQUESTS
+        if chance < self.throttle_rate + self.error_rate:
+            return HTTPStatus.INTERNAL_SERVER_ERROR
+        return None
+
+    def page(self, path: str) -> Optional[str]:
+        meta = self.releases.get(path)
+        if meta is None:
+            return None
+
+        return PAGE.format(title=escape(meta["name"]), meta=json.dumps(meta))
+
+    def music(self) -> str:
+        """Return the discography page which links to every release."""
+        items = (
+            MUSIC_GRID_ITEM.format(path=path, name=escape(meta["name"]))
+            for path, meta in self.releases.items()
+        )
+        return f'<ol id="music-grid">{"".join(items)}</ol>'
+
+    def search(self, query: str, item_type: str = "") -> str:
+        """Return search results with releases that share a word with the query."""
+        words = set(query.lower().split())
+        results: List[str] = []
+        for path, meta in self.releases.items():
+            _type = ITEM_TYPES.get(meta["@type"], "")
+            artist = meta["byArtist"]["name"]
+            if item_type and item_type != _type:
+                continue
+            if not words & set(f"{meta['name']} {artist}".lower().split()):
+                continue
+
+            published = datetime.strptime(meta["datePublished"][:11], "%d %b %Y")
+            results.append(
+                SEARCH_RESULT.format(
+                    url=f"{self.url}{path}",
+                    item_type=_type,
+                    item_type_name=ITEM_TYPE_NAMES[_type],
+                    name=escape(meta["name"]),
+                    artist=escape(artist),
+                    date=published.strftime("%d %B %Y"),
+                )
+            )
+        return f"<ul>{''.join(results)}</ul>"
+
+    def start(self) -> "StandIn":
+        """Serve requests in a background thread."""
+        self.thread = Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: StandIn
+
+    def respond(self, status: HTTPStatus, text: str = "") -> None:
+        with self.server.lock:
+            self.server.responses[status] += 1
+
+        body = (text or status.phrase).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.server.latency:
+            sleep(self.server.latency)
+
+        failure = self.server.pick_failure()
+        if failure:
+            self.respond(failure)
+            return
+
+        url = urlsplit(self.path)
+        if url.path == "/search":
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            text = self.server.search(params.get("q", ""), params.get("item_type", ""))
+            self.respond(HTTPStatus.OK, text)
+        elif url.path == "/music":
+            self.respond(HTTPStatus.OK, self.server.music())
+        elif page := self.server.page(url.path):
+            self.respond(HTTPStatus.OK, page)
+        else:
+            self.respond(HTTPStatus.NOT_FOUND)
+
+    def log_message(self, *_: Any) -> None:
+        """Keep quiet: load tests make a lot of requests."""
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--json-dir", type=Path, default=JSONS_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StandIn(**vars(args))
+    print(f"Serving {len(server.releases)} releases, search_url: {server.search_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Responses: {dict(server.responses)}")
+
+
+if __name__ == "__main__":
+    main()
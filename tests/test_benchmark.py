@@ -0,0 +1,387 @@
+"""Benchmarks of the parsing hot paths, using the JSON test corpus.
+
+Every benchmark checks that the current implementation returns the same results as
+the reference (previous) implementation, and reports how long each of them took.
+End-to-end lookups replay the corpus releases as release pages from a cassette, see
+`tests/cassette.py`.
+
+See the timings with
+
+    pytest -m benchmark -s
+
+Additionally, every named pattern of the parsing modules is fuzzed with adversarial
+inputs as long as the parser allows, and its worst-case runtime is reported. This
+takes a minute, therefore it only runs with
+
+    pytest -m fuzz -s tests/test_benchmark.py
+"""
+
+import json
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from pathlib import Path
+from time import perf_counter
+from timeit import repeat
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Pattern, Tuple
+
+import httpx
+import pytest
+from beetsplug.bandcamp import BandcampPlugin
+from beetsplug.bandcamp.album import AlbumName, WordPatterns
+from beetsplug.bandcamp.helpers import (
+    CATNUM_PAT,
+    CLEAN_PATTERNS,
+    LABEL_CATNUM,
+    MAX_LINE_LENGTH,
+    MAX_NAME_LENGTH,
+    PATTERNS,
+    Helpers,
+    label_catnum,
+)
+from beetsplug.bandcamp.metaguru import Metaguru, Release
+from beetsplug.bandcamp.track import DIGI_ONLY_PATTERN, Track
+from beetsplug.bandcamp.tracks import Tracks
+from rich.markup import escape
+from rich.table import Table
+
+from .cassette import Cassette, use_transport
+
+pytestmark = pytest.mark.benchmark
+
+JSONDict = Dict[str, Any]
+JSONS_DIR = Path("tests") / "json"
+RELEASE_URL = "https://label.bandcamp.com/album/{}"
+# simulated network latency of each request replayed in end-to-end lookups
+LATENCY = 0.005
+
+timings: List[Tuple[str, float, float]] = []
+worst_cases: List[Tuple[str, int, float, str]] = []
+
+PARSING_MODULES = ("helpers", "track", "album", "track_names")
+# patterns that scan lines of descriptions rather than names
+TEXT_PATTERNS = {
+    "CATNUM_PAT[header]",
+    "CATNUM_PAT[start_end]",
+    "CATNUM_PAT[anywhere]",
+    "DIGIT_LINE",
+    "PATTERNS[meta]",
+    "PATTERNS[track_alt]",
+    "AlbumName.ALBUM_IN_DESC",
+    "label_catnum",
+}
+# building blocks of the adversarial inputs: words and characters that the patterns
+# look for, repeated until the input is as long as the parser allows
+FUZZ_UNITS = [
+    " ", "  ", "-", "- ", " -", "(", "[", "\"", "*", "\n", "a", "A", "1", "a ", "A ",
+    "Aa ", "AB ", "A1", "A1 ", "A1\n", "AB1 ", "a-", "a-b ", "A.", "a.", "( ", "(a ",
+    "[a ", "ft ", "feat. a ", "bonus ", "digital ", "mix ", "(mix ", "a, ", "x ",
+    "by ", "EP ", "Vol ", "cat: ", "Label ", "Artist ",
+]  # fmt: skip
+FUZZ_AFFIXES = [("", ""), ("", "!"), ("ft ", ""), ("[ft ", ""), ("(", "x bonus")]
+FUZZ_SAMPLES = 200
+# worst-case runtime allowed for a single pattern on the longest input
+MAX_PATTERN_SECONDS = 1.0
+
+
+def best_time(func: Callable[[], Any], number: int = 3) -> float:
+    return min(repeat(func, number=number, repeat=3)) / number
+
+
+def compare(
+    name: str,
+    reference: Callable[[], Any],
+    current: Callable[[], Any],
+    number: int = 3,
+) -> None:
+    """Check that both implementations agree and record how long they took."""
+    assert current() == reference()
+    timings.append((name, best_time(reference, number), best_time(current, number)))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _report(console):
+    yield
+    table = Table("benchmark", "reference", "current", "speedup", title="Benchmarks")
+    for name, ref, cur in timings:
+        ref_ms, cur_ms = f"{ref * 1000:.2f} ms", f"{cur * 1000:.2f} ms"
+        table.add_row(name, ref_ms, cur_ms, f"{ref / cur:.2f}x")
+    console.print(table)
+
+    if worst_cases:
+        table = Table(title="Worst cases")
+        for column in ("pattern", "length", "worst case", "input"):
+            table.add_column(column, no_wrap=True)
+        for name, length, secs, text in sorted(worst_cases, key=lambda x: -x[2]):
+            secs_ms, start = f"{secs * 1000:.2f} ms", escape(repr(text[:24]))
+            table.add_row(escape(name), str(length), secs_ms, start)
+        console.print(table)
+
+
+@pytest.fixture(scope="module")
+def corpus() -> List[JSONDict]:
+    return [
+        json.loads(re.sub(r"\n *", "", p.read_text(encoding="utf-8")))
+        for p in sorted(JSONS_DIR.glob("*.json"))
+    ]
+
+
+@pytest.fixture(scope="module")
+def track_strings(corpus) -> List[str]:
+    """Return the names and artists of every track in the corpus."""
+    strings = []
+    for meta in corpus:
+        for track in (meta.get("track") or {}).get("itemListElement") or [meta]:
+            item = track.get("item", track)
+            strings.append(item.get("name") or "")
+            strings.append((item.get("byArtist") or {}).get("name") or "")
+    return strings
+
+
+@pytest.fixture(scope="module")
+def release_cassette(tmp_path_factory) -> Tuple[Path, List[str]]:
+    """Record the corpus releases as release pages and return their URLs."""
+    pages = {
+        RELEASE_URL.format(p.stem): "".join(p.read_text(encoding="utf-8").splitlines())
+        for p in sorted(JSONS_DIR.glob("*.json"))
+    }
+
+    def serve(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=pages[str(request.url)])
+
+    path = tmp_path_factory.mktemp("cassette")
+    cassette = Cassette(path, record=True, upstream=httpx.MockTransport(serve))
+    with httpx.Client(transport=cassette) as client:
+        for url in pages:
+            client.get(url)
+
+    return path, list(pages)
+
+
+def reference_parse_catalognum(
+    album: str, disctitle: str, description: str, label: str, artistitles: str
+) -> str:
+    """Catalogue number parsing that runs every pattern over its source in turn."""
+    cases: List[Tuple[Pattern[str], str]] = [
+        (CATNUM_PAT["header"], description),
+        (CATNUM_PAT["anywhere"], disctitle),
+        (CATNUM_PAT["anywhere"], album),
+        (CATNUM_PAT["start_end"], description),
+        (CATNUM_PAT["anywhere"], description),
+    ]
+    if label:
+        pat = re.compile(LABEL_CATNUM.format(re.escape(label)), re.VERBOSE)
+        cases.append((pat, "\n".join((album, disctitle, description))))
+
+    for pat, string in cases:
+        for m in pat.finditer(string):
+            catnum = m.group(1).strip()
+            if catnum.lower() not in artistitles:
+                if " " in catnum:
+                    first = catnum.split()[0].lower()
+                    if len(catnum) <= 5 and first not in label.lower():
+                        continue
+                return catnum
+    return ""
+
+
+def test_catalognum(corpus):
+    cases = []
+    for meta in corpus:
+        label = Helpers.get_label(meta)
+        artistitles = Tracks.from_json(meta).artistitles
+        texts = [meta.get("description"), meta.get("creditText")]
+        description = "\n".join(filter(None, texts))
+        cases.append((meta["name"], "", description, label, artistitles))
+        for media in Helpers.get_media_formats(meta.get("albumRelease") or []):
+            cases.append(("", media.title, media.description, label, artistitles))
+
+    parse_catalognum = Helpers.parse_catalognum.__wrapped__
+    compare(
+        "catalognum",
+        lambda: [reference_parse_catalognum(*c) for c in cases],
+        lambda: [parse_catalognum(*c) for c in cases],
+    )
+
+
+def reference_clean_album(name: str, to_clean: List[str], label: str = "") -> str:
+    """Album name cleanup that compiles the patterns of each word on every call."""
+    name = re.sub(r"^\[(.*)\]$", r"\1", name)
+
+    for w in map(re.escape, filter(None, to_clean)):
+        name = re.sub(rf" *(?i:(compiled )?by|vs|\W*split w) {w}", "", name)
+        if not re.search(
+            rf"\w {w} \w|(of|&) {w}|{w}(['_\d]| (deluxe|[el]p\b|&))", name, re.I
+        ):
+            name = re.sub(
+                rf"""
+    (?<! x )
+    (^|[^\])\w])+
+    (?i:{w})
+    ([^(\[\w]| _|(\d+$))*
+                """,
+                " ",
+                name,
+                flags=re.VERBOSE,
+            ).strip()
+
+    name = PATTERNS["ft"].sub("", name)
+    name = AlbumName.remove_va(name)
+    name = Helpers.clean_name(name)
+    if label:
+        pattern = re.compile(
+            rf"""
+            \W*
+            (?<!\w[ ])
+            \b{re.escape(label)}\b
+            (?!'|[ -][A-Za-z])
+            ([^[\]\w]|\d)*
+        """,
+            flags=re.VERBOSE | re.IGNORECASE,
+        )
+        name = pattern.sub(" ", name).strip()
+    name = AlbumName.REMIX_IN_TITLE.sub(" ", name).strip("- ")
+    name = AlbumName.CLEAN_EPLP.sub(lambda x: x.group(1).upper(), name)
+    return name.strip(" /")
+
+
+def test_clean_album(corpus, beets_config, monkeypatch):
+    """Clean album names with the arguments that the corpus releases pass in."""
+    cases = []
+    clean = AlbumName.clean
+
+    def record(name: str, to_clean: List[str], label: str = "") -> str:
+        cases.append((name, to_clean, label))
+        return clean(name, to_clean, label)
+
+    with monkeypatch.context() as m:
+        m.setattr(AlbumName, "clean", staticmethod(record))
+        for meta in corpus:
+            _ = Metaguru(meta, beets_config).album_name
+
+    compare(
+        "album name cleanup",
+        lambda: [reference_clean_album(*c) for c in cases],
+        lambda: [clean(*c) for c in cases],
+    )
+
+
+def test_clean_digi_name(track_strings):
+    def reference(name: str) -> Tuple[str, bool]:
+        clean_name = DIGI_ONLY_PATTERN.sub("", name)
+        return clean_name, clean_name != name
+
+    compare(
+        f"digital only cleanup, {len(track_strings)} names",
+        lambda: [reference(s) for s in track_strings],
+        lambda: [Track.clean_digi_name(s) for s in track_strings],
+    )
+
+
+def test_split_ft(track_strings):
+    def reference(value: str) -> Tuple[str, str, str]:
+        if m := PATTERNS["ft"].search(value):
+            grp = m.groupdict()
+            return grp["ft_artist"], grp["ft"], value.replace(m.group(), "")
+
+        return "", "", value
+
+    split_ft = Track.split_ft.__wrapped__
+    compare(
+        f"featuring artists, {len(track_strings)} names",
+        lambda: [reference(s) for s in track_strings],
+        lambda: [split_ft(s) for s in track_strings],
+    )
+
+
+def module_patterns(module: ModuleType) -> Iterator[Tuple[str, Pattern[str]]]:
+    """Yield patterns defined in the module and in its classes."""
+    for name, value in vars(module).items():
+        if isinstance(value, Pattern):
+            yield name, value
+        elif isinstance(value, type) and value.__module__ == module.__name__:
+            for attr, pat in vars(value).items():
+                if isinstance(pat, Pattern):
+                    yield f"{name}.{attr}", pat
+
+
+def named_patterns() -> Dict[str, Pattern[str]]:
+    """Return every named pattern of the parsing modules.
+
+    Patterns that are compiled for a specific word are made for a placeholder.
+    """
+    patterns: Dict[str, Pattern[str]] = {}
+    for module in PARSING_MODULES:
+        patterns.update(module_patterns(import_module(f"beetsplug.bandcamp.{module}")))
+
+    for group, pats in (("CATNUM_PAT", CATNUM_PAT), ("PATTERNS", PATTERNS)):
+        patterns.update((f"{group}[{k}]", v) for k, v in pats.items())
+
+    for idx, (pat, _, _) in enumerate(CLEAN_PATTERNS):
+        patterns[f"CLEAN_PATTERNS[{idx}]"] = pat
+
+    for field, pat in WordPatterns.make("Artist")._asdict().items():
+        patterns[f"WordPatterns.{field}"] = pat
+
+    patterns["label_catnum"] = label_catnum("Label")
+    patterns["AlbumName.label_pattern"] = AlbumName.label_pattern("Label")
+    return patterns
+
+
+def fuzz_inputs(length: int) -> Iterator[str]:
+    """Yield adversarial inputs of the given length.
+
+    Runs of a single unit is where overlapping quantifiers backtrack the most, while
+    the random ones mix the units up.
+    """
+    for prefix, suffix in FUZZ_AFFIXES:
+        for unit in FUZZ_UNITS:
+            body = length - len(prefix) - len(suffix)
+            yield prefix + (unit * body)[:body] + suffix
+
+    rand = random.Random(length)
+    for _ in range(FUZZ_SAMPLES):
+        units = rand.choices(FUZZ_UNITS, k=length)
+        yield "".join(units)[:length]
+
+
+NAMED_PATTERNS = named_patterns()
+
+
+@pytest.mark.fuzz
+@pytest.mark.parametrize("name", NAMED_PATTERNS)
+def test_pattern_worst_case(name):
+    pattern = NAMED_PATTERNS[name]
+    length = MAX_LINE_LENGTH if name in TEXT_PATTERNS else MAX_NAME_LENGTH
+
+    worst_secs, worst_text = 0.0, ""
+    for text in fuzz_inputs(length):
+        start = perf_counter()
+        pattern.sub("", text)
+        secs = perf_counter() - start
+        if secs > worst_secs:
+            worst_secs, worst_text = secs, text
+
+    worst_cases.append((name, length, worst_secs, worst_text))
+    assert worst_secs < MAX_PATTERN_SECONDS, f"{name} is too slow on {worst_text!r}"
+
+
+def test_album_for_id_end_to_end(release_cassette):
+    """Look up every release: fetch its page, parse it and build its albums."""
+    path, urls = release_cassette
+    plugin = BandcampPlugin()
+
+    def lookup(workers: int) -> List[Any]:
+        Release.from_html.cache_clear()
+        with use_transport(Cassette(path, latency=LATENCY)):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(plugin.album_for_id, urls))
+
+    compare(
+        f"album_for_id, {len(urls)} releases, 1 vs 4 workers",
+        lambda: lookup(1),
+        lambda: lookup(4),
+        number=1,
+    )
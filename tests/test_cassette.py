@@ -0,0 +1,58 @@
+"""Tests for the record and replay HTTP transport."""
+
+import gzip
+from time import perf_counter
+
+import httpx
+import pytest
+from beetsplug.bandcamp import BandcampPlugin
+
+from .cassette import Cassette, CassetteMiss, use_transport
+
+URL = "https://label.bandcamp.com/album/release"
+MISSING_URL = "https://label.bandcamp.com/album/missing"
+
+
+def serve(request: httpx.Request) -> httpx.Response:
+    if request.url == URL:
+        return httpx.Response(200, text="<html>Release</html>")
+    return httpx.Response(404, text="Not found")
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """Return the cassette directory with both URLs recorded."""
+    cassette = Cassette(tmp_path, record=True, upstream=httpx.MockTransport(serve))
+    with httpx.Client(transport=cassette) as client:
+        client.get(URL)
+        client.get(MISSING_URL)
+    return tmp_path
+
+
+def test_recordings_are_compressed(recorded):
+    recordings = sorted(recorded.iterdir())
+
+    assert len(recordings) == 2
+    with gzip.open(recordings[0], "rt") as f:
+        assert '"url": "https://label.bandcamp.com/album/' in f.read()
+
+
+def test_replay(recorded):
+    plugin = BandcampPlugin()
+    with use_transport(Cassette(recorded)):
+        assert plugin._get(URL) == "<html>Release</html>"
+        assert plugin._get(MISSING_URL) == ""
+
+
+def test_replay_without_recording(tmp_path):
+    with httpx.Client(transport=Cassette(tmp_path)) as client:
+        with pytest.raises(CassetteMiss, match="has not been recorded"):
+            client.get(URL)
+
+
+def test_replay_latency(recorded):
+    with httpx.Client(transport=Cassette(recorded, latency=0.05)) as client:
+        start = perf_counter()
+        client.get(URL)
+
+    assert perf_counter() - start >= 0.05
@@ -17,6 +17,12 @@ from beetsplug.bandcamp import get_args
         (["hello", "-l"], {"query": "hello", "search_type": "b", "index": None, "page": 1}),
         (["hello", "-l", "-o", "1"], {"query": "hello", "search_type": "b", "index": 1, "page": 1}),
         (["hello", "-l", "-p", "2"], {"query": "hello", "search_type": "b", "index": None, "page": 2}),
+        (["hello", "--profile"], {"query": "hello", "search_type": "", "index": None, "page": 1, "profile": True}),
+        (["hello", "--profile-output", "out.json"], {"query": "hello", "search_type": "", "index": None, "page": 1, "profile_output": "out.json"}),
+        (["serve"], {"query": "serve", "search_type": "", "index": None, "page": 1}),
+        (["--serve"], {"release_url": None, "query": "", "search_type": "", "index": None, "page": 1, "serve": "http://127.0.0.1:8338"}),
+        (["--serve", "unix:/tmp/beetcamp.sock"], {"release_url": None, "query": "", "search_type": "", "index": None, "page": 1, "serve": "unix:/tmp/beetcamp.sock"}),
+        (["https://label.bandcamp.com", "--crawl", "out.jsonl", "--jobs", "4", "--delay", "0.5"], {"query": "", "release_url": "https://label.bandcamp.com", "search_type": "", "index": None, "page": 1, "crawl": "out.jsonl", "jobs": 4, "delay": 0.5}),
     ],
 )
 # fmt: on
@@ -32,3 +38,21 @@ def test_required_parameter(capsys):
 
     capture = capsys.readouterr()
     assert "error: one of the arguments" in capture.err
+
+
+@pytest.mark.parametrize(
+    "cmdline, message",
+    [
+        (["https://label.bandcamp.com", "--crawl", "out.jsonl", "--jobs", "0"], "0 is not a positive number"),  # noqa: E501
+        (["hello", "--jobs", "4"], "can only be used with --crawl"),
+        (["hello", "--delay", "0.5"], "can only be used with --crawl"),
+        (["https://label.bandcamp.com", "--crawl", "out.jsonl", "--delay", "-1"], "-1 is not a non-negative number"),  # noqa: E501
+        (["https://label.bandcamp.com", "--crawl", "out.jsonl", "--delay", "nan"], "nan is not a non-negative number"),  # noqa: E501
+    ],
+)
+def test_crawl_options(capsys, cmdline, message):
+    sys.argv = ["beetcamp", *cmdline]
+    with pytest.raises(SystemExit):
+        get_args()
+
+    assert message in capsys.readouterr().err
@@ -0,0 +1,137 @@
+"""Tests for the label discography crawler."""
+
+import json
+from time import perf_counter
+
+import httpx
+import pytest
+from beetsplug.bandcamp import BandcampPlugin
+from beetsplug.bandcamp.crawl import Crawler, Throttle, music_url, release_urls
+
+from .cassette import use_transport
+from .server import StandIn
+
+LABEL_URL = "https://label.bandcamp.com"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def output(tmp_path):
+    return tmp_path / "releases.jsonl"
+
+
+def crawl(server, output, **kwargs):
+    return Crawler(BandcampPlugin(), output, delay=0, **kwargs).crawl(server.url)
+
+
+def read(output):
+    return [json.loads(line) for line in output.read_text().splitlines()]
+
+
+@pytest.mark.parametrize(
+    "url", [LABEL_URL, f"{LABEL_URL}/", f"{LABEL_URL}/music", f"{LABEL_URL}/album/a"]
+)
+def test_music_url(url):
+    assert music_url(url) == f"{LABEL_URL}/music"
+
+
+def test_release_urls():
+    html = """
+<ol id="music-grid" data-client-items="[{&quot;page_url&quot;: &quot;/album/c&quot;}]">
+<li><a href="/album/a?from=grid">A</a></li>
+<li><a href="https://other.com/track/b">B</a></li>
+<li><a href="/album/a">A</a></li>
+</ol>
+"""
+    html = html.replace("&quot;", '"')
+
+    assert release_urls(f"{LABEL_URL}/music", html) == [
+        f"{LABEL_URL}/album/c",
+        f"{LABEL_URL}/album/a",
+        "https://other.com/track/b",
+    ]
+
+
+def test_crawl(server, output):
+    counts = crawl(server, output, jobs=4)
+
+    records = read(output)
+    assert len(records) == len(server.releases)
+    assert counts == {"skipped": 0, "crawled": len(records)}
+    album = next(r for r in records if r["url"] == f"{server.url}/album/ute004")
+    assert album["albums"][0]["album"] == "UTE004"
+    track = next(r for r in records if "/track/" in r["url"])
+    assert track["track"]["title"]
+
+
+def test_crawl_resumes(server, output):
+    crawl(server, output)
+    lines = output.read_text().splitlines()
+    # the crawl was interrupted while writing the third record
+    output.write_text("\n".join([*lines[:2], lines[2][:10]]))
+
+    counts = crawl(server, output)
+
+    assert counts == {"skipped": 2, "crawled": len(lines) - 2}
+    resumed = output.read_text().splitlines()[3:]
+    assert len(list(map(json.loads, resumed))) == len(lines) - 2
+
+
+def test_failed_releases_are_retried(server, output):
+    url = f"{server.url}/album/ute004"
+    output.write_text(json.dumps({"url": url, "error": "Server Error"}) + "\n")
+
+    counts = crawl(server, output)
+
+    assert counts["skipped"] == 0
+    assert [r for r in read(output) if r["url"] == url][-1]["albums"]
+
+
+def test_throttle():
+    throttle = Throttle(0.05)
+    start = perf_counter()
+    for _ in range(3):
+        throttle.wait()
+
+    assert perf_counter() - start >= 0.1
+
+
+def test_fetch_waits_when_asked_to_slow_down(output):
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503),
+            httpx.Response(200, text="<html>Release</html>"),
+        ]
+    )
+    crawler = Crawler(BandcampPlugin(), output, delay=0)
+
+    with use_transport(httpx.MockTransport(lambda _: next(responses))):
+        assert crawler.fetch(f"{LABEL_URL}/album/a") == "<html>Release</html>"
+
+
+def test_fetch_gives_up_on_errors(output):
+    crawler = Crawler(BandcampPlugin(), output, delay=0)
+
+    with use_transport(httpx.MockTransport(lambda _: httpx.Response(500))):
+        record = crawler.crawl_release(f"{LABEL_URL}/album/a")
+
+    assert record["url"] == f"{LABEL_URL}/album/a"
+    assert "500" in record["error"]
+
+
+def test_unexpected_errors_are_recorded(output, monkeypatch):
+    def fail(*_):
+        raise TypeError
+
+    crawler = Crawler(BandcampPlugin(), output, delay=0)
+    monkeypatch.setattr(crawler, "fetch", fail)
+
+    record = crawler.crawl_release(f"{LABEL_URL}/album/a")
+
+    assert record == {"url": f"{LABEL_URL}/album/a", "error": "TypeError"}
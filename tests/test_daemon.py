@@ -0,0 +1,161 @@
+"""Tests for the lookup daemon."""
+
+from threading import Thread
+
+import pytest
+from beetsplug.bandcamp import BandcampPlugin
+from beetsplug.bandcamp.daemon import (
+    DaemonClient,
+    DaemonError,
+    DaemonHandler,
+    make_server,
+)
+from beetsplug.bandcamp.http import PAGE_CACHE_SIZE, http_get_text
+
+from .server import StandIn
+
+ALBUM_URL = "/album/ute004"
+TRACK_URL = "/track/arangel"
+
+
+@pytest.fixture(scope="module")
+def bandcamp():
+    with StandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def plugin(plugin, bandcamp):
+    plugin.config["search_url"] = bandcamp.search_url
+    return plugin
+
+
+@pytest.fixture(params=["http", "unix"])
+def address(request, tmp_path, plugin):
+    if request.param == "http":
+        server = make_server("http://127.0.0.1:0", plugin)
+        address = f"http://127.0.0.1:{server.server_address[1]}"
+    else:
+        address = f"unix:{tmp_path / 'beetcamp.sock'}"
+        server = make_server(address, plugin)
+
+    thread = Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield address
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def client(address):
+    return DaemonClient(address)
+
+
+def test_album(client, bandcamp):
+    albums = client.albums(f"{bandcamp.url}{ALBUM_URL}")
+
+    assert albums
+    assert albums[0].album_id == "https://ute-rec.bandcamp.com/album/ute004"
+    assert albums[0].tracks[0].track_id
+
+
+def test_track(client, bandcamp):
+    track = client.track(f"{bandcamp.url}{TRACK_URL}")
+
+    assert track
+    assert track.title == "Arangel"
+
+
+def test_search(client):
+    results = client.search({"query": "Arangel", "search_type": "t"})
+
+    assert [r["name"] for r in results] == ["Arangel"]
+
+
+def test_unknown_release(client, bandcamp):
+    assert client.track(f"{bandcamp.url}/track/unknown") is None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "file:///etc/passwd",
+        "http://127.0.0.1:22/",
+        "http://127.0.0.1:22/album/ute004",
+        "https://label.example.com/album/ute004",
+        "ftp://label.bandcamp.com/album/ute004",
+    ],
+)
+def test_non_bandcamp_url_is_rejected(plugin, client, url, monkeypatch):
+    monkeypatch.setattr(plugin, "_get", lambda _: pytest.fail("URL was fetched"))
+
+    with pytest.raises(DaemonError, match="400 Bad Request"):
+        client.albums(url)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"query": "Arangel", "page": "first"},
+        {"query": "Arangel", "search_url": "http://127.0.0.1:22"},
+        {"query": "Arangel", "get": "print"},
+    ],
+)
+def test_invalid_search_is_rejected(plugin, client, data, monkeypatch):
+    monkeypatch.setattr(plugin, "_get", lambda _: pytest.fail("URL was fetched"))
+
+    with pytest.raises(DaemonError, match="400 Bad Request"):
+        client.search(data)
+
+
+def test_search_page(client):
+    results = client.search({"query": "Arangel", "search_type": "t", "page": "1"})
+
+    assert [r["name"] for r in results] == ["Arangel"]
+
+
+def test_page_cache_size(plugin):
+    plugin.config["page_cache_size"] = 2
+    BandcampPlugin()
+
+    assert http_get_text.cache_info().maxsize == 2
+    http_get_text.resize(PAGE_CACHE_SIZE)
+
+
+def test_plugin_uses_daemon(plugin, address, monkeypatch):
+    endpoints = []
+    lookup = DaemonHandler.lookup
+
+    def record(self, endpoint, params):
+        endpoints.append(endpoint)
+        return lookup(self, endpoint, params)
+
+    monkeypatch.setattr(DaemonHandler, "lookup", record)
+    plugin.config["daemon"] = address
+
+    candidates = list(plugin.item_candidates(None, "Matriark", "Arangel"))
+
+    assert [c.title for c in candidates] == ["Arangel"]
+    assert endpoints == ["/search", "/track"]
+
+
+def test_plugin_falls_back_without_daemon(plugin, tmp_path):
+    plugin.config["daemon"] = f"unix:{tmp_path / 'missing.sock'}"
+
+    candidates = list(plugin.item_candidates(None, "Matriark", "Arangel"))
+
+    assert [c.title for c in candidates] == ["Arangel"]
+
+
+def test_unreachable_daemon(tmp_path):
+    client = DaemonClient(f"unix:{tmp_path / 'missing.sock'}")
+
+    with pytest.raises(DaemonError):
+        client.search({"query": "Arangel", "search_type": "t"})
+
+
+@pytest.mark.parametrize("address", ["https://127.0.0.1:8338", "127.0.0.1:8338"])
+def test_invalid_address(address):
+    with pytest.raises(ValueError, match="Invalid daemon address"):
+        DaemonClient(address)
@@ -1,5 +1,6 @@
 """Tests for genre functionality."""
 import pytest
+from beetsplug.bandcamp.genre import Genre
 from beetsplug.bandcamp.metaguru import Metaguru
 
 pytestmark = pytest.mark.parsing
@@ -114,3 +115,24 @@ def test_label_excluded_from_genre(keywords, label, expected, json_meta, beets_c
     json_meta["publisher"]["name"] = label
     json_meta.update(keywords=keywords)
     assert Metaguru(json_meta, beets_config).genre == expected
+
+
+def test_genre_matcher_is_built_once_per_config(beets_config):
+    config = beets_config["genre"]
+    config["always_include"] = ["^hard"]
+
+    matcher = Genre.from_config(config)
+
+    assert Genre.from_config({**config, "always_include": ["^hard"]}) is matcher
+    assert Genre.from_config({**config, "mode": "classical"}) is not matcher
+
+
+def test_keyword_decisions_are_cached(beets_config):
+    config = {**beets_config["genre"], "always_include": ["^cached"]}
+    keywords = ["cached keyword", "house"]
+    Genre.is_genre.cache_clear()
+
+    assert list(Metaguru.get_genre(keywords, config, "")) == ["cached keyword", "house"]
+    assert Genre.cache_hit_rate() == 0
+    assert list(Metaguru.get_genre(keywords, config, "")) == ["cached keyword", "house"]
+    assert Genre.cache_hit_rate() == 0.5
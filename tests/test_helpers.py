@@ -1,6 +1,13 @@
 """Module for the helpers module tests."""
 import pytest
-from beetsplug.bandcamp.helpers import Helpers
+from beetsplug.bandcamp import BandcampPlugin
+from beetsplug.bandcamp.cache import cache_stats, clear_caches
+from beetsplug.bandcamp.helpers import (
+    MAX_LINE_LENGTH,
+    Helpers,
+    scan_catalognums,
+    split_artist,
+)
 
 pytestmark = pytest.mark.parsing
 
@@ -107,3 +114,99 @@ def test_bundles_get_excluded(bundle_format, digital_format):
 )
 def test_split_artists(artists, expected):
     assert Helpers.split_artists(artists) == expected
+
+
+def test_split_artists_splits_each_artist_once():
+    split_artist.cache_clear()
+    artists = ["Art1, Art2", "Art2 & Art3", "Art1, Art2"]
+
+    first = Helpers.split_artists(artists)
+    first.append("modified")
+
+    assert Helpers.split_artists(artists) == ["Art1", "Art2", "Art3"]
+    assert split_artist.cache_info().currsize == 2
+
+
+def test_scan_catalognums():
+    text = "CAT001 on vinyl\nno digits here\nOut now: (ABC-002)\nCatalogue: XYZ003"
+    kinds = ("header", "start_end", "anywhere")
+
+    matches = [(m.kind, m.catalognum, m.start) for m in scan_catalognums(text, kinds)]
+
+    assert matches == [
+        ("start_end", "CAT001", 0),
+        ("anywhere", "CAT001", 0),
+        ("anywhere", "ABC-002", 41),
+        ("header", "XYZ003", 50),
+        ("start_end", "XYZ003", 61),
+        ("anywhere", "XYZ003", 61),
+    ]
+
+
+def test_parse_catalognum_cache():
+    parse_catalognum = Helpers.parse_catalognum
+    parse_catalognum.cache_clear()
+    description = "A long description of the release CAT001"
+
+    parse_catalognum(description=description)
+    parse_catalognum("", "", description)
+    parse_catalognum(album="another album")
+
+    assert parse_catalognum.cache_info() == (1, 2, 1024, 2)
+    # the cache does not hold on to the arguments
+    assert all(description not in str(key) for key in parse_catalognum._cache)
+
+    parse_catalognum.resize(1)
+    assert parse_catalognum.cache_info().currsize == 1
+    parse_catalognum.resize(1024)
+
+
+def test_catalognum_cache_size_config(plugin):
+    plugin.config["catalognum_cache_size"] = 8
+    BandcampPlugin()
+
+    assert Helpers.parse_catalognum.cache_info().maxsize == 8
+    Helpers.parse_catalognum.resize(1024)
+
+
+def test_clear_caches():
+    Helpers.parse_catalognum(album="Album CAT001")
+    Helpers.clean_name("Album (Free Download)")
+
+    clear_caches()
+
+    stats = cache_stats()
+    assert stats["Helpers.parse_catalognum"].currsize == 0
+    assert stats["Helpers.clean_name"].currsize == 0
+
+
+@pytest.mark.parametrize(
+    "padding",
+    ["Too long.\n" * MAX_LINE_LENGTH, "Too long. " * MAX_LINE_LENGTH + "\n"],
+)
+def test_parse_catalognum_scans_whole_text(padding):
+    assert Helpers.parse_catalognum(description=f"CAT001\n{padding}") == "CAT001"
+    assert Helpers.parse_catalognum(description=f"{padding}CAT001") == "CAT001"
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Album (Single)", "Album"),
+        # dotless and dotted i are matched by case-insensitive patterns
+        ("Album (Sıngle)", "Album"),
+        ("Album (SİNGLE)", "Album"),
+        ("Already Clean", "Already Clean"),
+    ],
+)
+def test_clean_name_triggers(name, expected):
+    assert Helpers.clean_name(name) == expected
+
+
+def test_parse_track_alts():
+    comments = "A1. First\nA2. Second\nB1. Third\nC1. Fourth\nA1. First again"
+
+    track_alts, medium_totals = Helpers.parse_track_alts(comments)
+
+    assert track_alts == ("A1", "A2", "B1", "C1")
+    assert medium_totals == {1: 3, 2: 1, 3: 0, 4: 0, 5: 0}
@@ -10,7 +10,8 @@ from functools import partial
 from itertools import groupby, starmap
 from operator import itemgetter
 from pathlib import Path
-from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 import pytest
 from _pytest.config import Config
@@ -18,7 +19,8 @@ from _pytest.fixtures import FixtureRequest
 from beets import IncludeLazyConfig
 from beets.autotag.hooks import AttrDict
 from beetsplug.bandcamp import BandcampPlugin
-from beetsplug.bandcamp.metaguru import Metaguru
+from beetsplug.bandcamp.cache import clear_caches
+from beetsplug.bandcamp.metaguru import Metaguru, Release
 from rich.console import Group
 from rich.panel import Panel
 from rich.traceback import install
@@ -38,6 +40,11 @@ JSONDict = Dict[str, Any]
 
 LIB_TESTS_DIR = Path("lib_tests")
 JSONS_DIR = Path("jsons")
+PARSE_TIMES_FILENAME = "parse_times.json"
+# parse time differences below this are noise
+MIN_PARSE_TIME_DIFF = 0.005
+# each release is parsed this many times and the fastest run is recorded
+PARSE_TIME_RUNS = 3
 
 IGNORE_FIELDS = {
     "bandcamp_artist_id",
@@ -72,6 +79,7 @@ class FieldDiff(NamedTuple):
 albums: List[Tuple[str, str]] = []
 fixed: List[Tuple[str, str]] = []
 new_fails: List[Tuple[str, str]] = []
+slower: List[Tuple[str, str]] = []
 
 
 @pytest.fixture(scope="module")
@@ -87,6 +95,28 @@ def target_dir(pytestconfig: Config) -> Path:
     return target_dir
 
 
+def read_parse_times(folder: Path) -> Dict[str, float]:
+    try:
+        with (folder / PARSE_TIMES_FILENAME).open() as f:
+            return json.load(f)  # type: ignore[no-any-return]
+    except FileNotFoundError:
+        return {}
+
+
+@pytest.fixture(scope="module")
+def base_parse_times(base_dir: Path) -> Dict[str, float]:
+    return read_parse_times(base_dir)
+
+
+@pytest.fixture(scope="module")
+def parse_times(target_dir: Path) -> Iterator[Dict[str, float]]:
+    """Collect parse time of each release and save them in the target directory."""
+    times = read_parse_times(target_dir)
+    yield times
+    with (target_dir / PARSE_TIMES_FILENAME).open("w") as f:
+        json.dump(times, f, indent=2, sort_keys=True)
+
+
 @pytest.fixture(scope="module")
 def config() -> IncludeLazyConfig:
     return BandcampPlugin().config.flatten()
@@ -135,11 +165,51 @@ def target(target_filepath: Path) -> AttrDict:
 
 
 @pytest.fixture
-def guru(config: IncludeLazyConfig, test_filepath: Path) -> Metaguru:
+def guru(
+    config: IncludeLazyConfig, test_filepath: Path, parse_times: Dict[str, float]
+) -> Metaguru:
+    """Parse the release and record how long it took.
+
+    The release is parsed from scratch a few times, with the caches cleared before each
+    run, and the fastest run is recorded, so that the order of the tests and the load
+    of the machine do not decide the result.
+    """
     with test_filepath.open() as f:
         test_data = f.read()
 
-    return Metaguru.from_html(test_data, config)
+    times = []
+    for _ in range(PARSE_TIME_RUNS):
+        clear_caches()
+        start = perf_counter()
+        release = Release.parse_html(test_data)
+        guru = Metaguru(release.meta, config, release)
+        _ = guru.singleton if "_track_" in test_filepath.name else guru.albums
+        times.append(perf_counter() - start)
+    parse_times[test_filepath.name] = min(times)
+
+    return guru
+
+
+@pytest.fixture
+def parse_time_regression(
+    pytestconfig: Config,
+    guru: Metaguru,
+    test_filepath: Path,
+    parse_times: Dict[str, float],
+    base_parse_times: Dict[str, float],
+) -> Optional[str]:
+    """Return the description of parse time regression, if there is one."""
+    before = base_parse_times.get(test_filepath.name)
+    after = parse_times[test_filepath.name]
+    if before is None or after - before < MIN_PARSE_TIME_DIFF:
+        return None
+
+    if after / before <= pytestconfig.getoption("parse_time_threshold"):
+        return None
+
+    regression = f"{before * 1000:.1f} ms -> {after * 1000:.1f} ms"
+    slower.append((wrap(test_filepath.name, "red"), regression))
+    return regression
 
 
 def escape(string: str) -> str:
@@ -172,7 +242,7 @@ def _report(oldnew) -> None:
 
     fails = [(wrap(x[0], "red"), x[1]) for x in new_fails if x]
     fix = [(wrap(x[0], "green"), x[1]) for x in fixed if x]
-    tables = [("Fixed", fix), ("Failed", fails)]
+    tables = [("Fixed", fix), ("Failed", fails), ("Slower", slower)]
     if albums:
         tables.insert(0, ("Albums", albums))
 
@@ -343,6 +413,8 @@ def difference(
 
 
 @pytest.mark.usefixtures("_report")
-def test_file(difference: bool) -> None:
+def test_file(difference: bool, parse_time_regression: Optional[str]) -> None:
     if difference:
         pytest.fail(pytrace=False)
+    if parse_time_regression:
+        pytest.fail(f"Parsing got slower: {parse_time_regression}", pytrace=False)
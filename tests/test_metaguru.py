@@ -1,10 +1,11 @@
 """Module the Metaguru class functionality."""
 
+import json
 from copy import deepcopy
 from datetime import date
 
 import pytest
-from beetsplug.bandcamp.metaguru import Metaguru
+from beetsplug.bandcamp.metaguru import Metaguru, Release
 
 pytestmark = pytest.mark.parsing
 
@@ -76,3 +77,61 @@ def test_digi_only_option(json_track, json_meta, beets_config):
     assert len(media_to_album["Digital Media"].tracks) == 2
     assert len(media_to_album["Vinyl"].tracks) == 1
     assert "Digital" not in media_to_album["Vinyl"].tracks[0].title
+
+
+def test_tracks_are_parsed_lazily(json_meta, beets_config):
+    guru = Metaguru(json_meta, beets_config)
+    _ = guru.image
+    assert "_tracks" not in vars(guru)
+
+    _ = guru.album_name
+    assert "_tracks" in vars(guru)
+
+
+def test_release_is_parsed_once_per_html(beets_config):
+    with open("tests/json/compilation.json", encoding="utf-8") as f:
+        html = "".join(f.read().splitlines())
+    Release.from_html.cache_clear()
+
+    first = Metaguru.from_html(html, deepcopy(beets_config))
+    beets_config["genre"]["maximum"] = 1
+    second = Metaguru.from_html(html, beets_config)
+
+    assert Release.from_html.cache_info().hits == 1
+    assert second.release is first.release
+    # each guru adjusts its own copy of the tracks
+    assert second.tracks is not first.tracks
+    assert [t.track_id for t in second.tracks] == [t.track_id for t in first.tracks]
+    fresh = Metaguru(json.loads(html), beets_config)
+    assert second.albums == fresh.albums
+    assert second.genre == fresh.genre != first.genre
+
+
+def test_release_content_hash(json_meta):
+    page = '<script type="application/ld+json">\n{}\n</script>'
+    html = page.format(json.dumps(json_meta))
+    reordered = page.format(json.dumps(dict(reversed(json_meta.items()))))
+    changed = page.format(json.dumps({**json_meta, "name": "Edited"}))
+
+    content_hash = Release.parse_html(html).content_hash
+    assert Release.parse_html(f"<p>Layout</p>{reordered}").content_hash == content_hash
+    assert Release.parse_html(changed).content_hash != content_hash
+
+
+def test_parsing_keeps_release_metadata(json_meta, beets_config):
+    release = Release(deepcopy(json_meta))
+
+    _ = Metaguru(release.meta, beets_config, release).albums
+
+    assert release.meta == json_meta
+
+
+def test_long_names_are_kept_in_full(json_track, json_meta, beets_config):
+    album, title = " ".join(["Album"] * 72), " ".join(["Title"] * 72)
+    json_track["item"].update(name=title)
+    json_meta.update(name=album)
+
+    album_info = Metaguru(json_meta, beets_config).albums[0]
+
+    assert album_info.album == album
+    assert album_info.tracks[0].title == title
@@ -0,0 +1,102 @@
+"""Tests for the optional lookup instrumentation."""
+
+import json
+import logging
+
+import httpx
+import pytest
+from beets.library import Item
+from beets.plugins import log
+from beetsplug.bandcamp import metrics
+from beetsplug.bandcamp.metaguru import Release
+
+from .cassette import use_transport
+
+ALBUM_URL = "https://label.bandcamp.com/album/release"
+
+
+@pytest.fixture
+def plugin(plugin):
+    with open("tests/json/album.json", encoding="utf-8") as f:
+        html = "".join(f.read().splitlines())
+
+    Release.from_html.cache_clear()
+    with use_transport(httpx.MockTransport(lambda _: httpx.Response(200, text=html))):
+        yield plugin
+
+
+def test_instrumentation_is_off_by_default(plugin):
+    assert plugin.metrics_sink is None
+
+
+def test_jsonl_sink(plugin, tmp_path):
+    path = tmp_path / "lookups.jsonl"
+    plugin.config["instrumentation"] = {"sink": "jsonl", "path": str(path)}
+    item = Item(mb_albumid=ALBUM_URL, album="Album", albumartist="Artist")
+
+    list(plugin.candidates([item], "Artist", "Album"))
+    list(plugin.candidates([item], "Artist", "Album"))
+
+    first, second = map(json.loads, path.read_text().splitlines())
+    assert first["call"] == "candidates"
+    assert first["query"] == "Album"
+    assert first["candidates"] == 2
+    assert first["requests"] == 2
+    assert first["cache_hits"] == 1
+    assert first["bytes_fetched"] > 0
+    assert {"fetch", "metadata", "tracks", "albums", "genre"} <= set(first["stages"])
+    # the release is parsed once, therefore the second lookup only builds albums
+    assert "tracks" not in second["stages"]
+
+
+def test_lookup_is_not_current_while_candidates_are_handled(plugin, tmp_path):
+    path = tmp_path / "lookups.jsonl"
+    plugin.config["instrumentation"] = {"sink": "jsonl", "path": str(path)}
+    item = Item(mb_albumid=ALBUM_URL, album="Album", albumartist="Artist")
+
+    for _ in plugin.candidates([item], "Artist", "Album"):
+        assert metrics._current.get() is None
+
+
+def test_sink_requires_emit():
+    with pytest.raises(TypeError):
+        metrics.Sink()  # type: ignore[abstract]
+
+
+def test_prometheus_sink(tmp_path):
+    path = tmp_path / "beetcamp.prom"
+    sink = metrics.PrometheusSink(str(path))
+
+    for _ in range(2):
+        with metrics.lookup("item_candidates", "Title", sink) as lookup:
+            metrics.record_fetch("text", cached=False)
+            with metrics.stage("search"):
+                pass
+            lookup.candidates += 3
+
+    text = path.read_text()
+    assert 'beetcamp_lookups_total{call="item_candidates"} 2' in text
+    assert 'beetcamp_stage_seconds_total{stage="search"}' in text
+    assert "beetcamp_candidates_total 6" in text
+    assert "beetcamp_fetched_bytes_total 8" in text
+
+
+def test_log_sink(caplog):
+    sink = metrics.make_sink({"sink": "log"}, log)
+    with caplog.at_level(logging.INFO, log.name):
+        with metrics.lookup("candidates", "{Album}", sink):  # type: ignore[arg-type]
+            pass
+
+    assert "candidates '{Album}': 0 candidates in" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "config, message",
+    [
+        ({"sink": "statsd"}, "Unknown instrumentation sink"),
+        ({"sink": "jsonl", "path": ""}, "requires a 'path'"),
+    ],
+)
+def test_bad_sink_config(config, message):
+    with pytest.raises(ValueError, match=message):
+        metrics.make_sink(config, logging.getLogger())
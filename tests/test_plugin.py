@@ -86,6 +86,22 @@ def plugin(monkeypatch, release):
     return pl
 
 
+def test_resolved_config_is_reused_until_config_changes():
+    pl = BandcampPlugin()
+    resolved = pl.resolved_config
+    assert pl.resolved_config is resolved
+
+    pl.config["search_max"] = 5
+    pl.beets_config["va_name"] = "VA"
+    try:
+        assert pl.resolved_config is not resolved
+        assert pl.resolved_config["search_max"] == 5
+        assert pl.resolved_config["va_name"] == "VA"
+    finally:
+        # remove both configuration sources that were added above
+        del pl.beets_config.sources[:2]
+
+
 @pytest.mark.parametrize("method", ["album_for_id", "track_for_id"])
 def test_handle_non_bandcamp_url(method):
     """The plugin should not break if a non-bandcamp URL is presented."""
@@ -0,0 +1,70 @@
+"""Tests for the command line profiling support."""
+
+import json
+import pstats
+
+import pytest
+from beetsplug.bandcamp.metaguru import Metaguru
+from beetsplug.bandcamp.profiling import cache_report, get_phase, profile_call
+
+
+@pytest.fixture
+def profile(beets_config):
+    with open("tests/json/album.json", encoding="utf-8") as f:
+        html = "".join(f.read().splitlines())
+
+    def parse():
+        return Metaguru(json.loads(html), beets_config).albums
+
+    albums, profile = profile_call(parse)
+    assert albums
+    return profile
+
+
+@pytest.mark.parametrize(
+    "func, expected_phase",
+    [
+        (("/site-packages/httpx/_client.py", 1, "get"), "network"),
+        (("~", 0, "<method 'recv_into' of '_ssl._SSLSocket' objects>"), "network"),
+        (("/beetsplug/bandcamp/http.py", 1, "http_get_text"), "network"),
+        (("/beetsplug/bandcamp/metaguru.py", 1, "albums"), "parse"),
+    ],
+)
+def test_get_phase(func, expected_phase):
+    assert get_phase(func) == expected_phase
+
+
+def test_report(profile):
+    report = profile.report(count=50)
+
+    assert report.startswith("Total ")
+    assert "Top network functions by cumulative time" in report
+    assert "Top parse functions by cumulative time" in report
+    assert "get_media_album" in report
+
+
+def test_cache_report(profile):
+    report = cache_report()
+
+    assert report.startswith("Caches")
+    assert "Helpers.parse_catalognum" in report
+    assert "Helpers.clean_name" in report
+
+
+def test_save_pstats(profile, tmp_path):
+    path = tmp_path / "profile.pstats"
+    profile.save(str(path))
+
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_save_speedscope(profile, tmp_path):
+    path = tmp_path / "profile.json"
+    profile.save(str(path))
+
+    data = json.loads(path.read_text())
+    frames = data["shared"]["frames"]
+    (sampled,) = data["profiles"]
+    assert frames[:2] == [{"name": "network"}, {"name": "parse"}]
+    assert len(sampled["samples"]) == len(sampled["weights"]) == len(frames) - 2
+    assert all(stack[0] in {0, 1} for stack in sampled["samples"])
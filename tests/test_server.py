@@ -0,0 +1,64 @@
+"""Tests for lookups against the local Bandcamp stand-in server."""
+
+from http import HTTPStatus
+
+import pytest
+from beets.library import Item
+
+from .server import StandIn
+
+
+@pytest.fixture
+def server(request):
+    options = getattr(request, "param", {})
+    with StandIn(**options) as server:
+        yield server
+
+
+@pytest.fixture
+def plugin(plugin, server):
+    plugin.config["search_url"] = server.search_url
+    return plugin
+
+
+def test_album_candidates(plugin):
+    item = Item(album="UTE004", albumartist="Mikkel Rev")
+
+    candidates = list(plugin.candidates([item], "Mikkel Rev", "UTE004"))
+
+    assert candidates
+    assert candidates[0].album_id == "https://ute-rec.bandcamp.com/album/ute004"
+
+
+def test_item_candidates(plugin):
+    item = Item(title="Arangel", artist="Matriark")
+
+    candidates = list(plugin.item_candidates(item, "Matriark", "Arangel"))
+
+    assert [c.title for c in candidates] == ["Arangel"]
+
+
+def test_unknown_page(plugin, server):
+    assert plugin._get(f"{server.url}/album/unknown") == ""
+    assert server.responses == {HTTPStatus.NOT_FOUND: 1}
+
+
+@pytest.mark.parametrize(
+    "server, status",
+    [
+        ({"throttle_rate": 1}, HTTPStatus.TOO_MANY_REQUESTS),
+        ({"error_rate": 1}, HTTPStatus.INTERNAL_SERVER_ERROR),
+    ],
+    indirect=["server"],
+)
+def test_failures(plugin, server, status):
+    assert plugin._get(f"{server.url}/album/ute004") == ""
+    assert server.responses == {status: 1}
+
+
+def test_failures_are_reproducible():
+    def statuses():
+        with StandIn(error_rate=0.3, throttle_rate=0.3, seed=1) as server:
+            return [server.pick_failure() for _ in range(20)]
+
+    assert statuses() == statuses()
@@ -0,0 +1,129 @@
+"""Tests for the bulk album sync."""
+
+import httpx
+import pytest
+from beets.library import Item, Library
+from beetsplug.bandcamp import sync as bcsync
+from beetsplug.bandcamp.http import http_get_text
+from beetsplug.bandcamp.sync import HASH_FIELD, Sync
+
+from . import server
+from .cassette import use_transport
+
+ALBUM_URL = "https://ute-rec.bandcamp.com/album/ute004"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def bandcamp():
+    """Serve release pages made of the JSON fixtures under their original URLs.
+
+    Synced albums get their canonical URL, therefore it must be served, too.
+    """
+    stand_in = server.StandIn()
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        page = stand_in.page(request.url.path)
+        return httpx.Response(200, text=page) if page else httpx.Response(404)
+
+    with use_transport(httpx.MockTransport(respond)):
+        yield
+    stand_in.server_close()
+
+
+@pytest.fixture
+def lib():
+    lib = Library(":memory:")
+    for album_id, title in [
+        (ALBUM_URL, "Old title"),
+        ("https://ute-rec.bandcamp.com/album/unknown", "Missing"),
+        ("a5d1c2f5-8c5d-4b38-9ab7-0d6d43fbd8a0", "MusicBrainz"),
+    ]:
+        item = Item(title=title, track=1, disc=1, media="Digital Media")
+        album = lib.add_album([item])
+        album.mb_albumid = album_id
+        album.store()
+    return lib
+
+
+def sync(plugin, lib, **kwargs):
+    return Sync(plugin, lib, batch_size=2, **kwargs).run(plugin.bandcamp_albums(lib, []))
+
+
+def test_bandcamp_albums(plugin, lib):
+    assert [a.mb_albumid for a in plugin.bandcamp_albums(lib, [])] == [
+        ALBUM_URL,
+        "https://ute-rec.bandcamp.com/album/unknown",
+    ]
+
+
+def test_sync(plugin, lib):
+    assert sync(plugin, lib) == {"updated": 1, "unchanged": 0, "failed": 1}
+
+    album = lib.albums("ute004").get()
+    assert album.album == "UTE004"
+    assert album[HASH_FIELD]
+    assert [i.title for i in album.items()] == ["The Human Experience (Empathy Mix)"]
+    assert lib.items("MusicBrainz").get().title == "MusicBrainz"
+
+
+def test_unchanged_releases_are_skipped(plugin, lib):
+    sync(plugin, lib)
+    album = lib.albums("ute004").get()
+    album.album = "Edited"
+    album.store()
+
+    assert sync(plugin, lib) == {"updated": 0, "unchanged": 1, "failed": 1}
+    assert lib.albums("Edited").get()
+
+    assert sync(plugin, lib, force=True)["updated"] == 1
+    assert not lib.albums("Edited").get()
+
+    # nothing has changed since the forced update
+    assert sync(plugin, lib, force=True) == {"updated": 0, "unchanged": 1, "failed": 1}
+
+
+def test_release_is_fetched_once(plugin, lib, monkeypatch):
+    urls = []
+    get = bcsync.http_get_text_uncached
+    monkeypatch.setattr(
+        bcsync, "http_get_text_uncached", lambda url: urls.append(url) or get(url)
+    )
+    http_get_text.cache_clear()
+
+    sync(plugin, lib)
+
+    assert urls == [ALBUM_URL, "https://ute-rec.bandcamp.com/album/unknown"]
+    assert not http_get_text.contains(ALBUM_URL)
+
+
+def test_page_layout_changes_are_ignored(plugin, lib, monkeypatch):
+    sync(plugin, lib)
+    monkeypatch.setattr(server, "PAGE", f"<p>New layout</p>{server.PAGE}")
+
+    assert sync(plugin, lib)["unchanged"] == 1
+
+
+def test_imported_album_hash(plugin, lib):
+    album = next(plugin.bandcamp_albums(lib, []))
+    plugin.album_for_id(album.mb_albumid)
+    plugin.album_imported(lib, album)
+
+    assert lib.get_album(album.id)[HASH_FIELD]
+    assert sync(plugin, lib)["unchanged"] == 1
+    assert lib.items("Old title").get()
+
+
+def test_imported_album_page_is_not_fetched_again(plugin, lib, monkeypatch):
+    album = next(plugin.bandcamp_albums(lib, []))
+    monkeypatch.setattr(plugin, "_get", lambda _: pytest.fail("page was fetched"))
+
+    plugin.album_imported(lib, album)
+
+    assert not lib.get_album(album.id).get(HASH_FIELD)
+
+
+def test_pretend(plugin, lib):
+    sync(plugin, lib, pretend=True)
+
+    assert lib.items("Old title").get()
+    assert not any(a.get(HASH_FIELD) for a in lib.albums())
@@ -41,3 +41,16 @@ def test_parse_catalognum_from_track_name(
 )
 def test_check_digi_only(name, expected_digi_only, expected_name):
     assert Track.clean_digi_name(name) == (expected_name, expected_digi_only)
+
+
+def test_make_keeps_only_parsed_fields():
+    json = {
+        "@id": "track_url",
+        "position": 1,
+        "duration": "P00H05M30S",
+        "recordingOf": {"lyrics": {"text": "Line 1\r\nLine 2"}},
+    }
+    track = Track.make(json, "Artist - Title")
+
+    assert (track.duration, track.lyrics) == (330, "Line 1\nLine 2")
+    assert json not in vars(track).values()
@@ -4,6 +4,7 @@ from operator import attrgetter
 
 import pytest
 from beetsplug.bandcamp.track import Track
+from beetsplug.bandcamp.track_names import TrackNames
 from beetsplug.bandcamp.tracks import Tracks
 from rich.panel import Panel
 from rich.table import Table
@@ -127,3 +128,16 @@ def test_parse_track_name(name, expected, json_track, json_meta, console):
     result_track = list(tracks)[0]
     result = dict(zip(fields, attrgetter(*fields)(result_track)))
     assert result == expected, print_result(console, name, expected, result)
+
+
+@pytest.mark.parametrize(
+    "names, expected",
+    [
+        ([], []),
+        (["A - Title CAT1", "B - Other CAT1 CAT1"], ["-", "CAT1"]),
+        (["Title", "Title (Remix)", "Title - Edit"], ["Title"]),
+        (["One", "Two", "Two"], []),
+    ],
+)
+def test_common_words(names, expected):
+    assert TrackNames.common_words(names) == expected